@@ -0,0 +1,94 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'model_registry',
+        sa.Column('model_id', sa.Uuid(), nullable=False),
+        sa.Column('model_name', sa.String(length=150), nullable=False),
+        sa.Column('display_name', sa.String(length=200), nullable=False),
+        sa.Column('version', sa.String(length=20), nullable=False),
+        sa.Column('parent_model_id', sa.Uuid(), nullable=True),
+        sa.Column('source_repo', sa.String(length=255), nullable=True),
+        sa.Column('model_type', sa.Enum('TRANSFORMER', 'GNN', 'SLM', 'REGRESSION', 'ENSEMBLE', name='modeltype'), nullable=False),
+        sa.Column('domain', sa.String(length=50), nullable=False),
+        sa.Column('tags', sa.Text(), nullable=True),
+        sa.Column('artifact_path', sa.String(length=255), nullable=False),
+        sa.Column('model_format', sa.String(length=50), nullable=False),
+        sa.Column('input_schema', postgresql.JSONB(), nullable=True),
+        sa.Column('output_schema', postgresql.JSONB(), nullable=True),
+        sa.Column('dependencies', postgresql.JSONB(), nullable=True),
+        sa.Column('dataset_name', sa.String(length=150), nullable=True),
+        sa.Column('dataset_version', sa.String(length=50), nullable=True),
+        sa.Column('training_parameters', postgresql.JSONB(), nullable=True),
+        sa.Column('framework', sa.String(length=50), nullable=True),
+        sa.Column('hardware_used', sa.String(length=100), nullable=True),
+        sa.Column('metrics', postgresql.JSONB(), nullable=True),
+        sa.Column('benchmark_dataset', sa.String(length=150), nullable=True),
+        sa.Column('status', sa.Enum('DEVELOPMENT', 'STAGING', 'PRODUCTION', 'DEPRECATED', name='modelstatus'), nullable=False),
+        sa.Column('created_by', sa.String(length=100), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('last_updated_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('reviewer', sa.String(length=100), nullable=True),
+        sa.Column('approval_notes', sa.Text(), nullable=True),
+        sa.Column('checksum', sa.String(length=64), nullable=False),
+        sa.Column('encryption_status', sa.Boolean(), nullable=True),
+        sa.Column('signed_by', sa.String(length=100), nullable=True),
+        sa.Column('access_policy_id', sa.Uuid(), nullable=True),
+        sa.Column('inference_endpoint', sa.String(length=255), nullable=True),
+        sa.Column('resource_requirements', postgresql.JSONB(), nullable=True),
+        sa.Column('last_accessed', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('access_count', sa.Integer(), nullable=True),
+        sa.Column('usage_stats', postgresql.JSONB(), nullable=True),
+        sa.Column('env_type', sa.String(length=20), nullable=True),
+        sa.PrimaryKeyConstraint('model_id')
+    )
+    op.create_index('ix_model_registry_model_name', 'model_registry', ['model_name'])
+
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('email', sa.String(length=100), nullable=False),
+        sa.Column('hashed_password', sa.String(length=255), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('role', sa.String(length=50), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'access_policies',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('rules', postgresql.JSONB(), nullable=False),
+        sa.Column('created_by', sa.String(length=100), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('access_policies')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
+    op.drop_index('ix_model_registry_model_name', table_name='model_registry')
+    op.drop_table('model_registry')
+    sa.Enum(name='modelstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='modeltype').drop(op.get_bind(), checkfirst=True)
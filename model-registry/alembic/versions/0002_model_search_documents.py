@@ -0,0 +1,54 @@
+"""Full-text search documents for registry entries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_table(
+        'model_search_documents',
+        sa.Column('model_id', sa.Uuid(), nullable=False),
+        sa.Column('search_vector', postgresql.TSVECTOR(), nullable=False),
+        sa.Column('terms', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['model_id'], ['model_registry.model_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('model_id')
+    )
+    op.create_index(
+        'ix_model_search_documents_vector', 'model_search_documents', ['search_vector'],
+        postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_model_search_documents_terms', 'model_search_documents', ['terms'],
+        postgresql_using='gin', postgresql_ops={'terms': 'gin_trgm_ops'}
+    )
+
+    # Backfill documents for the existing registry
+    op.execute("""
+        INSERT INTO model_search_documents (model_id, search_vector, terms)
+        SELECT model_id,
+               setweight(to_tsvector('simple', coalesce(model_name, '') || ' ' || coalesce(display_name, '')), 'A')
+               || setweight(to_tsvector('simple', coalesce(tags, '')), 'B')
+               || setweight(to_tsvector('simple', coalesce(domain, '') || ' ' || coalesce(framework, '')), 'C')
+               || setweight(to_tsvector('simple', coalesce(dataset_name, '')), 'D'),
+               lower(concat_ws(' ', model_name, display_name, tags, domain, framework, dataset_name))
+        FROM model_registry
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_model_search_documents_terms', table_name='model_search_documents')
+    op.drop_index('ix_model_search_documents_vector', table_name='model_search_documents')
+    op.drop_table('model_search_documents')
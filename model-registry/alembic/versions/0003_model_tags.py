@@ -0,0 +1,39 @@
+"""Normalized model tags
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'model_tags',
+        sa.Column('model_id', sa.Uuid(), nullable=False),
+        sa.Column('tag', sa.String(length=100), nullable=False),
+        sa.ForeignKeyConstraint(['model_id'], ['model_registry.model_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('model_id', 'tag')
+    )
+    op.create_index('ix_model_tags_tag_model_id', 'model_tags', ['tag', 'model_id'])
+
+    # Backfill from the comma separated tags column
+    op.execute("""
+        INSERT INTO model_tags (model_id, tag)
+        SELECT DISTINCT model_id, left(lower(trim(tag)), 100)
+        FROM model_registry, unnest(string_to_array(tags, ',')) AS tag
+        WHERE trim(tag) <> ''
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_model_tags_tag_model_id', table_name='model_tags')
+    op.drop_table('model_tags')
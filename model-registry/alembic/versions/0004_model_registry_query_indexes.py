@@ -0,0 +1,54 @@
+"""Indexes for the ModelService query shapes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+PRODUCTION = sa.text("status = 'PRODUCTION'")
+
+# (name, columns, partial index predicate)
+INDEXES = [
+    ('ix_model_registry_created_at_model_id', ['created_at', 'model_id'], None),
+    ('ix_model_registry_model_type_created_at', ['model_type', 'created_at', 'model_id'], None),
+    ('ix_model_registry_domain_created_at', ['domain', 'created_at', 'model_id'], None),
+    ('ix_model_registry_status_created_at', ['status', 'created_at', 'model_id'], None),
+    ('ix_model_registry_production_created_at', ['created_at'], PRODUCTION),
+    ('ix_model_registry_production_type', ['model_type', 'created_at'], PRODUCTION),
+    ('ix_model_registry_production_type_domain', ['model_type', 'domain', 'created_at'], PRODUCTION),
+    ('ix_model_registry_production_domain', ['domain', 'created_at'], PRODUCTION),
+    ('ix_model_registry_parent_model_id', ['parent_model_id'], None),
+    (
+        'ix_model_registry_changed_at',
+        [sa.text('coalesce(last_updated_at, created_at)'), 'model_id'],
+        None
+    ),
+]
+
+
+def upgrade() -> None:
+    # Build without locking writes on a live registry
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(
+                name, 'model_registry', columns,
+                postgresql_where=where, postgresql_concurrently=True, if_not_exists=True
+            )
+    op.execute("ANALYZE model_registry")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name='model_registry', postgresql_concurrently=True, if_exists=True
+            )
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.core.telemetry import CACHE_EVICTIONS, CACHE_REQUESTS
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after ``ttl`` seconds.
+
+    When ``maxsize`` is reached the least recently used entry is dropped.
+    Hits, misses and evictions are counted, and exported as ``cache_*``
+    metrics under ``name`` when one is given.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024, name: Optional[str] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str, label: str) -> None:
+        setattr(self, counter, getattr(self, counter) + 1)
+        if self.name is not None:
+            if counter == "evictions":
+                CACHE_EVICTIONS.labels(self.name, label).inc()
+            else:
+                CACHE_REQUESTS.labels(self.name, label).inc()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] < time.monotonic():
+                del self._data[key]
+                self._count("evictions", "expired")
+                item = None
+            if item is None:
+                self._count("misses", "miss")
+                return None
+            self._data.move_to_end(key)
+            self._count("hits", "hit")
+            return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value``; ``ttl`` shortens (or lengthens) its lifetime."""
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._count("evictions", "capacity")
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry for which ``predicate(key, value)`` is true."""
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+            for key in keys:
+                del self._data[key]
+                self._count("evictions", "invalidated")
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
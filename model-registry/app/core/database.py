@@ -1,11 +1,105 @@
+from contextlib import asynccontextmanager
+import threading
+from typing import Any, AsyncIterator, Callable, List, Optional, TypeVar, Union
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.core.routing import ReplicaSet, RoutingSession, mark_written
+from app.core.telemetry import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_pool
+
+T = TypeVar("T")
+DBSession = Union[Session, AsyncSession]
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Translate a sync database URL to the matching async driver."""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+def engine_options(url: str, use_async: bool = False) -> dict:
+    """Pool configuration from settings; SQLite keeps SQLAlchemy's defaults."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool if use_async else InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return options
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+instrument_pool(engine, "primary")
+
+read_engines = [create_engine(url, **engine_options(url)) for url in settings.DATABASE_READ_URLS]
+for index, read_engine in enumerate(read_engines):
+    instrument_pool(read_engine, f"replica-{index}")
+
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    replicas=ReplicaSet(read_engines, settings.DATABASE_READ_BALANCING) if read_engines else None
+)
+
+# Async engines exist only once the DATABASE_ASYNC path asks for them, so
+# sync deployments neither need the async drivers nor keep idle pools
+async_engine: Optional[AsyncEngine] = None
+async_read_engines: List[AsyncEngine] = []
+_async_sessionmaker: Optional[async_sessionmaker] = None
+_async_lock = threading.Lock()
+
+
+def async_session_factory() -> async_sessionmaker:
+    """The async sessionmaker, creating the async engines on first use."""
+    global async_engine, async_read_engines, _async_sessionmaker
+    with _async_lock:
+        if _async_sessionmaker is not None:
+            return _async_sessionmaker
+        primary = create_async_engine(
+            async_database_url(settings.DATABASE_URL),
+            **engine_options(settings.DATABASE_URL, use_async=True)
+        )
+        instrument_pool(primary.sync_engine, "primary_async")
+        replicas = [
+            create_async_engine(async_database_url(url), **engine_options(url, use_async=True))
+            for url in settings.DATABASE_READ_URLS
+        ]
+        for index, read_engine in enumerate(replicas):
+            instrument_pool(read_engine.sync_engine, f"replica-{index}_async")
+
+        # Objects must stay readable after commit: lazy loads can't run once the
+        # response is being serialized outside the session's greenlet
+        _async_sessionmaker = async_sessionmaker(
+            primary,
+            autoflush=False,
+            expire_on_commit=False,
+            sync_session_class=RoutingSession,
+            replicas=ReplicaSet(
+                [read_engine.sync_engine for read_engine in replicas],
+                settings.DATABASE_READ_BALANCING
+            ) if replicas else None
+        )
+        async_engine, async_read_engines = primary, replicas
+        return _async_sessionmaker
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
@@ -18,5 +112,49 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with async_session_factory()() as db:
+        yield db
+
+
+# Session dependency used by the API routers, chosen once at startup
+get_session = get_async_db if settings.DATABASE_ASYNC else get_db
+
+
+@asynccontextmanager
+async def owned_session(like: DBSession) -> AsyncIterator[DBSession]:
+    """A new session of the same kind as ``like``, for work that may outlive
+    the request owning ``like`` (e.g. a load other requests wait on).
+
+    Pinned to the primary when ``like`` has written, so it still reads
+    the request's own writes.
+    """
+    if isinstance(like, AsyncSession):
+        async with async_session_factory()() as db:
+            if like.sync_session.info.get("wrote"):
+                mark_written(db.sync_session)
+            yield db
+        return
+
+    db = SessionLocal()
+    try:
+        if like.info.get("wrote"):
+            mark_written(db)
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def run_db(db: DBSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``fn(session, *args, **kwargs)`` without blocking the event loop.
+
+    On an ``AsyncSession`` the sync code runs on the async driver through
+    ``run_sync``; a plain ``Session`` is handed to the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
 def create_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
@@ -0,0 +1,80 @@
+import hashlib
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence
+
+from fastapi import Request
+from starlette.responses import Response
+
+from app.core.serialization import FastJSONResponse
+from app.schemas.model import VERSION_FIELDS
+
+# Written without stamping last_updated_at; every such write also bumps
+# access_count and last_accessed (downloads update usage_stats too)
+_COUNTER_FIELDS = {"access_count", "last_accessed", "usage_stats"}
+
+
+def _version(entry: Any, fields: Sequence[str]) -> tuple:
+    """What changes whenever the ``fields`` representation of ``entry`` does.
+
+    Edits stamp ``last_updated_at``; access counters and download stats are
+    written without touching it, so they are part of the version only when
+    returned.
+    """
+    version = (str(entry.model_id), str(entry.last_updated_at or entry.created_at))
+    if _COUNTER_FIELDS.intersection(fields):
+        version += (entry.access_count, str(entry.last_accessed))
+    return version
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def entry_etag(entry: Any, fields: Sequence[str]) -> str:
+    """Strong ETag of one entry rendered with ``fields``."""
+    return f'"{_digest(_version(entry, fields), tuple(fields))}"'
+
+
+def page_etag(entries: Iterable[Any], fields: Sequence[str], *extra: Any) -> str:
+    """Weak ETag of a list page; ``extra`` covers totals, cursors and scores."""
+    return f'W/"{_digest([_version(entry, fields) for entry in entries], tuple(fields), extra)}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against ``If-None-Match``, as RFC 9110 prescribes for GET."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+async def conditional_entry(
+    request: Request,
+    load: Callable[[Sequence[str]], Awaitable[Optional[Any]]],
+    fields: Sequence[str],
+    render: Callable[[Any], Any]
+) -> Optional[Response]:
+    """Response for a single-entry GET, or ``None`` when there is no entry.
+
+    With ``If-None-Match`` only the version columns are loaded first, so an
+    unchanged entry is answered with 304 without reading or serializing
+    the rest of the row.
+    """
+    if request.headers.get("if-none-match"):
+        version = await load(VERSION_FIELDS)
+        if version is None:
+            return None
+        etag = entry_etag(version, fields)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    entry = await load(fields)
+    if entry is None:
+        return None
+    return FastJSONResponse(render(entry), headers={"ETag": entry_etag(entry, fields)})
@@ -0,0 +1,176 @@
+import functools
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
+from prometheus_client import start_http_server
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.telemetry import (
+    DB_QUERY_DURATION,
+    DB_REQUEST_DURATION,
+    DB_REQUEST_QUERIES,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    SERVICE_METHOD_DURATION,
+)
+
+logger = logging.getLogger(__name__)
+
+SQL_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
+
+
+class RequestStats:
+    """SQL work done on behalf of the request being handled.
+
+    ``profile``, set by the SQL profiling middleware, additionally gets
+    every statement passed to its ``record``.
+    """
+
+    __slots__ = ("queries", "db_time", "profile")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.profile = None
+
+
+# Set per request by PrometheusMiddleware; the threadpool and the async
+# driver's greenlets run with a copy of the context, so statements issued
+# there are counted against the right request
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def sql_operation(statement: str) -> str:
+    operation = statement.lstrip()[:6].upper()
+    return operation if operation in SQL_OPERATIONS else "OTHER"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._instrumentation_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_instrumentation_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    DB_QUERY_DURATION.labels(sql_operation(statement)).observe(elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+        if stats.profile is not None:
+            stats.profile.record(conn, statement, parameters, elapsed, executemany)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that handled ``scope``, e.g. ``/models/{model_id}``."""
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class PrometheusMiddleware:
+    """Records latency, in-flight requests and SQL work per route template.
+
+    A plain ASGI middleware, so streamed responses are timed until their
+    last chunk is sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_template(scope)
+            HTTP_REQUEST_DURATION.labels(method, route, str(status_code)).observe(time.perf_counter() - started)
+            DB_REQUEST_QUERIES.labels(route).observe(stats.queries)
+            DB_REQUEST_DURATION.labels(route).observe(stats.db_time)
+            in_flight.dec()
+            current_request.reset(token)
+
+
+def _timed(service: str, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    histogram = SERVICE_METHOD_DURATION.labels(service, name)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+    return wrapper
+
+
+def timed_methods(service: str):
+    """Class decorator timing every public method into ``service_method_duration_seconds``."""
+    def decorate(cls):
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith("_") or isinstance(attribute, (staticmethod, classmethod)) or not callable(attribute):
+                continue
+            setattr(cls, name, _timed(service, name, attribute))
+        return cls
+    return decorate
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def metrics_registry() -> CollectorRegistry:
+    """The registry to expose: every worker's samples in multiprocess mode."""
+    if not multiprocess_enabled():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_response() -> Response:
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+def start_metrics_server(port: int) -> bool:
+    """Serve the exposition on its own port; False if another worker already does."""
+    try:
+        start_http_server(port, registry=metrics_registry())
+    except OSError:
+        # In multiprocess mode the worker holding the port reports for all
+        logger.info("Metrics port %s already bound, not serving it from this worker", port)
+        return False
+    return True
+
+
+def mark_worker_stopped() -> None:
+    """Drop this worker's live gauges from the multiprocess exposition."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
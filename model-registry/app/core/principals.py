@@ -0,0 +1,150 @@
+import hashlib
+import time
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.model import ApiKey, User
+
+# Changing any of these must take effect before the cached copy expires
+_SECURITY_ATTRIBUTES = ("email", "hashed_password", "is_active", "role")
+_API_KEY_ATTRIBUTES = ("user_id", "key_hash", "scopes", "expires_at", "revoked_at")
+
+
+class PrincipalCache:
+    """Users resolved per bearer token, so a hit skips both the JWT decode
+    and the user query.
+
+    An entry lives ``ttl`` seconds at most and never past the token's own
+    expiry. Committed changes to a user's email, password, active flag or
+    role drop their entries in this process right away; other processes
+    pick them up within ``ttl``.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 10000, enabled: bool = True):
+        self.enabled = enabled
+        self.ttl = ttl
+        self._cache = TTLCache(ttl, maxsize, name="principal")
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[User]:
+        if not self.enabled:
+            return None
+        return self._cache.get(self._key(token))
+
+    def set(self, token: str, user: User, expires_at: Optional[float] = None) -> None:
+        """Cache ``user`` (detached from its session) until ``expires_at`` at the latest."""
+        if not self.enabled:
+            return
+        ttl = self.ttl if expires_at is None else min(self.ttl, expires_at - time.time())
+        if ttl > 0:
+            self._cache.set(self._key(token), user, ttl=ttl)
+
+    def invalidate(self, user_id: UUID) -> int:
+        """Forget every token resolved to ``user_id``."""
+        return self._cache.delete_where(lambda _, user: user.id == user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, **self._cache.stats()}
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    enabled=settings.PRINCIPAL_CACHE_ENABLED
+)
+
+
+class ValidatedKey(NamedTuple):
+    """An API key that passed validation, with its (detached) owner."""
+    key_id: UUID
+    user: User
+    scopes: FrozenSet[str]
+    expires_at: Optional[float]
+
+
+class ApiKeyCache:
+    """Validated API keys by the keyed hash of the presented key.
+
+    A hit authenticates a key without touching the database. Revoking a
+    key, changing its scopes or expiry, or changing its owner's security
+    attributes drops the entry in this process on commit; other processes
+    pick the change up within ``ttl``.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 10000, enabled: bool = True):
+        self.enabled = enabled
+        self.ttl = ttl
+        self._cache = TTLCache(ttl, maxsize, name="api_key")
+
+    def get(self, digest: str) -> Optional[ValidatedKey]:
+        if not self.enabled:
+            return None
+        return self._cache.get(digest)
+
+    def set(self, digest: str, key: ValidatedKey) -> None:
+        if not self.enabled:
+            return
+        ttl = self.ttl if key.expires_at is None else min(self.ttl, key.expires_at - time.time())
+        if ttl > 0:
+            self._cache.set(digest, key, ttl=ttl)
+
+    def invalidate_key(self, key_id: UUID) -> int:
+        return self._cache.delete_where(lambda _, key: key.key_id == key_id)
+
+    def invalidate_user(self, user_id: UUID) -> int:
+        return self._cache.delete_where(lambda _, key: key.user.id == user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, **self._cache.stats()}
+
+
+api_key_cache = ApiKeyCache(
+    ttl=settings.API_KEY_CACHE_TTL_SECONDS,
+    maxsize=settings.API_KEY_CACHE_MAX_ENTRIES,
+    enabled=settings.API_KEY_CACHE_ENABLED
+)
+
+
+def _changed(session, instance, attributes) -> bool:
+    state = inspect(instance)
+    return instance in session.deleted or any(
+        state.attrs[name].history.has_changes() for name in attributes
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_principals(session, flush_context):
+    for instance in (*session.dirty, *session.deleted):
+        if isinstance(instance, User) and _changed(session, instance, _SECURITY_ATTRIBUTES):
+            session.info.setdefault("changed_principals", set()).add(instance.id)
+        elif isinstance(instance, ApiKey) and _changed(session, instance, _API_KEY_ATTRIBUTES):
+            session.info.setdefault("changed_api_keys", set()).add(instance.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_principals(session):
+    for user_id in session.info.pop("changed_principals", ()):
+        principal_cache.invalidate(user_id)
+        api_key_cache.invalidate_user(user_id)
+    for key_id in session.info.pop("changed_api_keys", ()):
+        api_key_cache.invalidate_key(key_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_principals(session):
+    session.info.pop("changed_principals", None)
+    session.info.pop("changed_api_keys", None)
@@ -0,0 +1,187 @@
+import logging
+import re
+from collections import defaultdict
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy.engine import Connection
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.instrumentation import RequestStats, current_request, route_template, sql_operation
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {"postgresql": "EXPLAIN ", "sqlite": "EXPLAIN QUERY PLAN "}
+EXPLAINABLE = frozenset({"SELECT", "WITH", "UPDATE", "DELETE"})
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+\"?(\w+)", re.IGNORECASE)
+
+
+class ProfiledStatement:
+    __slots__ = ("statement", "parameters", "duration", "plan")
+
+    def __init__(self, statement: str, parameters: Any, duration: float, plan: Optional[List[str]]):
+        self.statement = statement
+        self.parameters = parameters
+        self.duration = duration
+        self.plan = plan
+
+    def summary(self) -> str:
+        """Operation and first table, e.g. ``SELECT model_registry``."""
+        table = _TABLE.search(self.statement)
+        return f"{sql_operation(self.statement)} {table.group(1)}" if table else sql_operation(self.statement)
+
+
+def explain(conn: Connection, statement: str, parameters: Any) -> Optional[List[str]]:
+    """Plan of ``statement`` on the connection that just ran it.
+
+    Goes through the DBAPI cursor so the EXPLAIN is neither instrumented
+    nor profiled itself. On PostgreSQL it runs inside a savepoint: a
+    failed statement aborts the whole transaction there, and the request
+    that is being profiled still owns it.
+    """
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or sql_operation(statement) not in EXPLAINABLE:
+        return None
+    savepoint = conn.dialect.name == "postgresql"
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT sql_profile_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = [str(row[-1]) for row in cursor.fetchall()]
+        except Exception:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT sql_profile_explain")
+            raise
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT sql_profile_explain")
+        return plan
+    except Exception:
+        logger.debug("EXPLAIN failed for %s", statement, exc_info=True)
+        return None
+    finally:
+        cursor.close()
+
+
+class SQLProfile:
+    """Every statement one request ran, with plans of the slow ones."""
+
+    def __init__(self, slow_statement: float):
+        self.slow_statement = slow_statement
+        self.statements: List[ProfiledStatement] = []
+
+    def record(self, conn: Connection, statement: str, parameters: Any, duration: float, executemany: bool) -> None:
+        plan = None
+        if duration >= self.slow_statement and not executemany:
+            plan = explain(conn, statement, parameters)
+        self.statements.append(
+            ProfiledStatement(statement, None if executemany else parameters, duration, plan)
+        )
+
+    @property
+    def db_time(self) -> float:
+        return sum(statement.duration for statement in self.statements)
+
+    def slowest(self, count: int) -> List[ProfiledStatement]:
+        return sorted(self.statements, key=lambda statement: statement.duration, reverse=True)[:count]
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int, int]]:
+        """``(statement, runs, distinct parameter sets)`` for statements that
+        ran with identical parameters more than once, or ``threshold`` times
+        or more with any parameters (the N+1 pattern)."""
+        runs = defaultdict(list)
+        for statement in self.statements:
+            if statement.parameters is not None:
+                runs[statement.statement].append(repr(statement.parameters))
+        found = []
+        for statement, parameters in runs.items():
+            distinct = len(set(parameters))
+            if len(parameters) > 1 and (distinct < len(parameters) or len(parameters) >= threshold):
+                found.append((statement, len(parameters), distinct))
+        return found
+
+    def server_timing(self, top: int) -> str:
+        entries = [f'db;dur={self.db_time * 1000:.2f};desc="{len(self.statements)} statements"']
+        entries.extend(
+            f'sql-{rank};dur={statement.duration * 1000:.2f};desc="{statement.summary()}"'
+            for rank, statement in enumerate(self.slowest(top), 1)
+        )
+        return ", ".join(entries)
+
+
+def _one_line(statement: str) -> str:
+    return " ".join(statement.split())
+
+
+def report(scope: Scope, status_code: int, profile: SQLProfile) -> None:
+    """Log the request if it crossed any SQL_PROFILE_* threshold."""
+    db_time = profile.db_time
+    repeated = profile.repeated(settings.SQL_PROFILE_REPEAT_THRESHOLD)
+    slow = [statement for statement in profile.statements if statement.duration >= profile.slow_statement]
+    if not (
+        db_time * 1000 >= settings.SQL_PROFILE_SLOW_REQUEST_MS
+        or len(profile.statements) > settings.SQL_PROFILE_MAX_STATEMENTS
+        or repeated
+        or slow
+    ):
+        return
+
+    lines = [
+        f"{scope['method']} {route_template(scope)} {status_code}: "
+        f"{len(profile.statements)} statements, {db_time * 1000:.1f} ms in the database"
+    ]
+    for statement in profile.slowest(settings.SQL_PROFILE_TOP_STATEMENTS):
+        lines.append(f"  {statement.duration * 1000:8.2f} ms  {_one_line(statement.statement)}")
+    for statement, runs, distinct in repeated:
+        kind = "identical" if distinct < runs else "N+1"
+        lines.append(f"  ran {runs}x ({distinct} distinct parameter sets, {kind}): {_one_line(statement)}")
+    for statement in slow:
+        if statement.plan:
+            lines.append(f"  plan of {statement.duration * 1000:.2f} ms {statement.summary()}:")
+            lines.extend(f"    {row}" for row in statement.plan)
+    logger.warning("\n".join(lines))
+
+
+class SQLProfilingMiddleware:
+    """Per-request SQL profile while ``SQL_PROFILING_ENABLED`` is on.
+
+    Adds a ``Server-Timing`` header with the statement count, total
+    database time and the slowest statements, and logs requests crossing
+    the SQL_PROFILE_* thresholds together with repeated statements and
+    EXPLAIN output of slow ones.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.SQL_PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_request.get()
+        token = None
+        if stats is None:
+            stats = RequestStats()
+            token = current_request.set(stats)
+        profile = stats.profile = SQLProfile(settings.SQL_PROFILE_SLOW_STATEMENT_MS / 1000)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", profile.server_timing(settings.SQL_PROFILE_TOP_STATEMENTS)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stats.profile = None
+            if token is not None:
+                current_request.reset(token)
+            report(scope, status_code, profile)
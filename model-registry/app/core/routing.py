@@ -0,0 +1,106 @@
+import functools
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+
+
+class ReplicaSet:
+    """Read replicas of the primary database and how to pick one."""
+
+    def __init__(self, engines: List[Engine], strategy: str = ROUND_ROBIN):
+        if strategy not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica balancing strategy: {strategy}")
+        self.engines = engines
+        self.strategy = strategy
+        self._cycle = itertools.cycle(engines)
+        self._lock = threading.Lock()
+        # Checked-out connections per engine, tracked independently of the
+        # pool class so least-connections also works with NullPool
+        self._in_use: Dict[Engine, int] = {engine: 0 for engine in engines}
+        for engine in engines:
+            event.listen(engine.pool, "checkout", functools.partial(self._adjust, engine, 1))
+            event.listen(engine.pool, "checkin", functools.partial(self._adjust, engine, -1))
+
+    def _adjust(self, engine: Engine, delta: int, *args) -> None:
+        with self._lock:
+            self._in_use[engine] += delta
+
+    def choose(self) -> Engine:
+        with self._lock:
+            if self.strategy == LEAST_CONNECTIONS:
+                return min(self.engines, key=self._in_use.__getitem__)
+            return next(self._cycle)
+
+
+class RoutingSession(Session):
+    """Session that sends read-only work to replicas.
+
+    Statements go to a replica only inside :func:`replica_reads` and only
+    until the session has written anything; from then on every statement
+    uses the primary so a request always reads its own writes. A session
+    sticks to the first replica it picks so that related reads (a page and
+    its count) see the same snapshot.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self._replica: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replicas
+            and self.info.get("read_only")
+            and not self.info.get("wrote")
+            and not self._flushing
+        ):
+            if self._replica is None:
+                self._replica = self.replicas.choose()
+            return self._replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_written(session, flush_context):
+    session.info["wrote"] = True
+
+
+def mark_written(db: Session) -> None:
+    """Pin ``db`` to the primary, e.g. before a read-modify-write."""
+    db.info["wrote"] = True
+
+
+@contextmanager
+def replica_reads(db: Session):
+    previous = db.info.get("read_only", False)
+    db.info["read_only"] = True
+    try:
+        yield db
+    finally:
+        db.info["read_only"] = previous
+
+
+def read_only(method):
+    """Run a ``ModelService`` method against a replica when one is configured."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with replica_reads(self.db):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def writes(method):
+    """Keep a mutating ``ModelService`` method, and its lookups, on the primary."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        mark_written(self.db)
+        return method(self, *args, **kwargs)
+    return wrapper
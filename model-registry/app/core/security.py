@@ -1,18 +1,32 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import DBSession, get_session, run_db
+from app.core.principals import api_key_cache, principal_cache
+from app.core.telemetry import (
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_PENDING,
+    PASSWORD_HASH_QUEUE_WAIT,
+    PASSWORD_HASH_REJECTED,
+)
 from app.models.model import User
-from app.schemas.model import TokenData
+from app.services.api_keys import API_KEY_PREFIX, ApiKeyService, api_key_usage, hash_api_key, required_scope
+
+T = TypeVar("T")
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-security = HTTPBearer()
+security = HTTPBearer(auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -23,6 +37,77 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """Runs bcrypt on its own bounded thread pool.
+
+    Keeps a login storm from occupying the shared request threadpool.
+    Once ``workers + max_queue`` operations are pending, further ones are
+    refused with 503 and ``Retry-After`` instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_queue: int, retry_after: int):
+        self.workers = workers
+        self.capacity = workers + max_queue
+        self.retry_after = retry_after
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _submit(self, operation: str, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        with self._lock:
+            if self._pending >= self.capacity:
+                PASSWORD_HASH_REJECTED.labels(operation).inc()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent password operations, retry later",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+            self._pending += 1
+            PASSWORD_HASH_PENDING.set(self._pending)
+
+        submitted = time.perf_counter()
+
+        def timed() -> T:
+            started = time.perf_counter()
+            PASSWORD_HASH_QUEUE_WAIT.labels(operation).observe(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+        future = self._executor.submit(timed)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            PASSWORD_HASH_PENDING.set(self._pending)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(
+            self._submit("verify", verify_password, plain_password, hashed_password)
+        )
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit("hash", get_password_hash, password))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -34,37 +119,128 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def decode_token(token: str) -> dict:
+    """Claims of a valid access token; raises 401 otherwise."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
         raise credentials_exception
-    return token_data
+    if payload.get("sub") is None:
+        raise credentials_exception
+    return payload
+
+
+def _not_authenticated() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
 
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
 
-def get_current_user(
-    token_data: TokenData = Depends(verify_token),
-    db: Session = Depends(get_db)
+
+async def authenticate_user(db: DBSession, email: str, password: str) -> Optional[User]:
+    user = await run_db(db, get_user_by_email, email)
+    if not user:
+        return None
+    if not await password_hasher.verify(password, user.hashed_password):
+        return None
+    return user
+
+
+def create_user(db: Session, email: str, hashed_password: str) -> User:
+    db_user = User(
+        email=email,
+        hashed_password=hashed_password
+    )
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+
+async def create_account(db: DBSession, email: str, password: str) -> User:
+    """Register a user; 400 if the email is taken."""
+    if await run_db(db, get_user_by_email, email):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    hashed_password = await password_hasher.hash(password)
+    return await run_db(db, create_user, email, hashed_password)
+
+
+def issue_access_token(user: User) -> str:
+    return create_access_token(
+        data={"sub": user.email},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
+
+def _load_principal(db: Session, email: str) -> Optional[User]:
+    user = get_user_by_email(db, email)
+    if user is not None:
+        # Cached across requests; must not be expired by this session's commits
+        db.expunge(user)
+    return user
+
+
+async def authenticate_api_key(request: Request, db: DBSession, key: str) -> User:
+    """Owner of a valid API key that carries the scope ``request`` needs."""
+    digest = hash_api_key(key)
+    validated = api_key_cache.get(digest)
+    if validated is None:
+        validated = await run_db(db, lambda session: ApiKeyService(session).validate(key, digest))
+        if validated is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        api_key_cache.set(digest, validated)
+
+    scope = required_scope(request.method, request.url.path)
+    if scope is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="API keys cannot be used here")
+    if scope not in validated.scopes:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"API key lacks scope {scope}")
+    api_key_usage.record(validated.key_id)
+    request.state.api_key = validated
+    return validated.user
+
+
+async def get_current_user(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    api_key: Optional[str] = Depends(api_key_header),
+    db: DBSession = Depends(get_session)
 ):
-    user = db.query(User).filter(User.email == token_data.email).first()
+    # API keys come in X-API-Key or as a bearer token; JWTs never start with mr_
+    if api_key is None and credentials is not None and credentials.credentials.startswith(API_KEY_PREFIX):
+        api_key = credentials.credentials
+    if api_key is not None:
+        return await authenticate_api_key(request, db, api_key)
+    if credentials is None:
+        raise _not_authenticated()
+
+    token = credentials.credentials
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
+    payload = decode_token(token)
+    user = await run_db(db, _load_principal, payload["sub"])
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    principal_cache.set(token, user, expires_at=payload.get("exp"))
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)):
+async def get_current_active_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
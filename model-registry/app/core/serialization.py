@@ -0,0 +1,56 @@
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+from app.models.model import ModelRegistryEntry
+from app.schemas.model import MODEL_FIELDS, CountStrategy
+
+SEARCH_FIELDS = ("score", "highlights")
+
+
+def entry_dict(entry: ModelRegistryEntry, fields: Sequence[str] = MODEL_FIELDS) -> Dict[str, Any]:
+    """``fields`` of a loaded entry as plain values, without ``ModelResponse``.
+
+    Rows coming from the database already satisfy the schema, so they are
+    not validated again; UUIDs, datetimes and enums are left for orjson.
+    """
+    return {field: getattr(entry, field) for field in fields}
+
+
+def page_dict(
+    models: Iterable[ModelRegistryEntry],
+    fields: Sequence[str],
+    total: Optional[int],
+    page: int,
+    size: int,
+    count_strategy: CountStrategy,
+    next_cursor: Optional[str]
+) -> Dict[str, Any]:
+    """Body of a ``ModelListResponse``/``SearchResponse`` page."""
+    return {
+        "models": [entry_dict(entry, fields) for entry in models],
+        "total": total,
+        "page": page,
+        "size": size,
+        "count_strategy": count_strategy,
+        "next_cursor": next_cursor,
+    }
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content)
+
+
+def plain(content: Any) -> Any:
+    """``content`` as API clients see it: strings for UUIDs, datetimes and enums."""
+    return orjson.loads(dumps(content))
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson response returned directly from a route.
+
+    Returning a ``Response`` skips FastAPI's ``response_model`` validation
+    and ``jsonable_encoder`` pass; the declared ``response_model`` still
+    documents the shape.
+    """
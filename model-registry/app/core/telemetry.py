@@ -0,0 +1,236 @@
+import time
+from typing import Any, Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Connection pool
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond pool_size (negative while the pool is not yet full)",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after pool_timeout",
+    ["engine"]
+)
+DB_POOL_CONNECTIONS_OPENED = Counter(
+    "db_pool_connections_opened_total",
+    "New DBAPI connections opened by the pool",
+    ["engine"]
+)
+DB_POOL_INVALIDATIONS = Counter(
+    "db_pool_invalidations_total",
+    "Connections invalidated (disconnects, failed pre-pings, recycles)",
+    ["engine", "kind"]
+)
+
+
+class _TimedCheckoutMixin:
+    """Times how long ``_do_get`` blocks waiting for a free connection."""
+
+    engine_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(self.engine_name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.engine_name).observe(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """Feed pool events of ``engine`` into the ``db_pool_*`` metrics."""
+    pool = engine.pool
+    if isinstance(pool, _TimedCheckoutMixin):
+        pool.engine_name = name
+
+    def update_gauges(*args):
+        if isinstance(pool, QueuePool):
+            DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+            DB_POOL_OVERFLOW.labels(name).set(pool.overflow())
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS_OPENED.labels(name).inc()
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        DB_POOL_INVALIDATIONS.labels(name, "hard").inc()
+
+    @event.listens_for(pool, "soft_invalidate")
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        DB_POOL_INVALIDATIONS.labels(name, "soft").inc()
+
+    event.listen(pool, "checkout", update_gauges)
+    event.listen(pool, "checkin", update_gauges)
+    event.listen(pool, "close", update_gauges)
+
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """Point-in-time view of a pool for the health endpoint."""
+    status = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            checked_out=pool.checkedout(),
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            timeout=pool.timeout(),
+        )
+    return status
+
+
+# Gauges use multiprocess_mode="livesum" so that, with
+# PROMETHEUS_MULTIPROC_DIR set, the exposition sums live workers
+
+# HTTP requests, labeled by route template rather than raw path
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the end of its response",
+    ["method", "route", "status"],
+    buckets=(0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+
+# Database statements, in total and per request
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time spent executing one SQL statement",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+DB_REQUEST_QUERIES = Histogram(
+    "db_request_queries",
+    "SQL statements executed while handling one request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250)
+)
+DB_REQUEST_DURATION = Histogram(
+    "db_request_duration_seconds",
+    "Total time spent in SQL statements while handling one request",
+    ["route"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+# Service layer
+SERVICE_METHOD_DURATION = Histogram(
+    "service_method_duration_seconds",
+    "Time spent in one service method call",
+    ["service", "method"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+
+# Access accumulators (model access counts, API key usage)
+ACCESS_PENDING_MODELS = Gauge(
+    "access_accumulator_pending_models",
+    "Entries with access counts waiting to be flushed",
+    ["accumulator"],
+    multiprocess_mode="livesum"
+)
+ACCESS_FLUSH_LAG = Histogram(
+    "access_accumulator_flush_lag_seconds",
+    "Age of the oldest pending access when its batch reached the database",
+    ["accumulator"],
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+)
+ACCESS_FLUSH_DURATION = Histogram(
+    "access_accumulator_flush_duration_seconds",
+    "Time spent writing one batch of access counts",
+    ["accumulator"]
+)
+ACCESS_FLUSHED_MODELS = Counter(
+    "access_accumulator_flushed_models_total",
+    "Per-entry access count updates written by the accumulator",
+    ["accumulator"]
+)
+
+
+# In-process caches
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by result",
+    ["cache", "result"]
+)
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total",
+    "Entries dropped from a cache (expired, capacity, invalidated)",
+    ["cache", "reason"]
+)
+CACHE_COALESCED_LOADS = Counter(
+    "cache_coalesced_loads_total",
+    "Cache misses that waited for an in-flight load instead of querying",
+    ["cache"]
+)
+
+
+# Password hashing pool
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Time bcrypt spent hashing or verifying one password",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5)
+)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a password operation waited for a free hashing thread",
+    ["operation"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+)
+PASSWORD_HASH_PENDING = Gauge(
+    "password_hash_pending_operations",
+    "Password operations running or queued on the hashing pool",
+    multiprocess_mode="livesum"
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password operations refused with 503 because the hashing queue was full",
+    ["operation"]
+)
+
+
+# Artifact storage
+ARTIFACT_TRANSFER_BYTES = Counter(
+    "artifact_transfer_bytes_total",
+    "Artifact bytes moved through the API",
+    ["backend", "direction"]
+)
+ARTIFACT_TRANSFER_DURATION = Histogram(
+    "artifact_transfer_duration_seconds",
+    "Time to move one artifact through the API",
+    ["backend", "direction"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+)
@@ -4,10 +4,26 @@ from fastapi.security import HTTPBearer
 from contextlib import asynccontextmanager
 from starlette.middleware.sessions import SessionMiddleware
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
-from app.core.database import engine, create_tables
+from app.core import database
+from app.core.database import engine, read_engines, create_tables
+from app.core.instrumentation import (
+    PrometheusMiddleware,
+    mark_worker_stopped,
+    metrics_response,
+    start_metrics_server,
+)
+from app.core.profiling import SQLProfilingMiddleware
+from app.core.principals import api_key_cache, principal_cache
+from app.core.security import password_hasher
+from app.core.telemetry import pool_status
 from app.routers import models, auth, metrics
+from app.services.access_accumulator import access_accumulator
+from app.services.api_keys import api_key_usage
+from app.services.model_cache import model_cache
+from app.services.pagination import count_cache_stats
 from app.routers import ui as ui_routes
 
 security = HTTPBearer()
@@ -16,7 +32,20 @@ security = HTTPBearer()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_tables()
+    if settings.DATABASE_ASYNC:
+        # Fail at startup, not on the first request, without the async driver
+        database.async_session_factory()
+    if settings.PROMETHEUS_PORT is not None:
+        start_metrics_server(settings.PROMETHEUS_PORT)
+    if settings.ACCESS_BATCHING_ENABLED:
+        access_accumulator.start()
+    api_key_usage.start()
     yield
+    if settings.ACCESS_BATCHING_ENABLED:
+        await run_in_threadpool(access_accumulator.stop)
+    await run_in_threadpool(api_key_usage.stop)
+    await run_in_threadpool(password_hasher.shutdown)
+    mark_worker_stopped()
 
 
 app = FastAPI(
@@ -37,6 +66,12 @@ app.add_middleware(
 # Enable cookie-based sessions for the UI
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
 
+# Off unless SQL_PROFILING_ENABLED; inside PrometheusMiddleware to share its request stats
+app.add_middleware(SQLProfilingMiddleware)
+
+# Outermost, so it times everything below it
+app.add_middleware(PrometheusMiddleware)
+
 # Serve static assets for the UI
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -52,6 +87,35 @@ async def root():
     return {"message": "Quarlets Model Registry API", "version": "1.0.0"}
 
 
+if settings.PROMETHEUS_PORT is None:
+    # Not under /metrics, which serves model metrics
+    @app.get(settings.PROMETHEUS_PATH, include_in_schema=False)
+    async def prometheus_metrics():
+        return metrics_response()
+
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/health/db")
+async def database_health():
+    pools = {"primary": pool_status(engine.pool)}
+    if database.async_engine is not None:
+        pools["primary_async"] = pool_status(database.async_engine.sync_engine.pool)
+    for index, read_engine in enumerate(read_engines):
+        pools[f"replica-{index}"] = pool_status(read_engine.pool)
+    for index, read_engine in enumerate(database.async_read_engines):
+        pools[f"replica-{index}_async"] = pool_status(read_engine.sync_engine.pool)
+    return {"pools": pools}
+
+
+@app.get("/health/cache")
+async def cache_health():
+    return {
+        "model": model_cache.stats(),
+        "count": count_cache_stats(),
+        "principal": principal_cache.stats(),
+        "api_key": api_key_cache.stats(),
+    }
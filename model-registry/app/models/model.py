@@ -1,11 +1,29 @@
-from sqlalchemy import Column, String, Text, Boolean, Integer, TIMESTAMP, Enum
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import (
+    Column, String, Text, Boolean, Integer, TIMESTAMP, Enum, JSON, Uuid,
+    ForeignKey, Index, event, text
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.sqlite import DATETIME as SQLITE_DATETIME
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from typing import List, Optional
 import uuid
 import enum
 
 from app.core.database import Base
 
+# JSONB on PostgreSQL, plain JSON on SQLite (used by the test suite)
+JSONType = JSONB().with_variant(JSON(), "sqlite")
+
+# Server-generated timestamp; on SQLite bound values are stored in the same
+# format CURRENT_TIMESTAMP produces so keyset comparisons line up
+ServerTimestamp = TIMESTAMP(timezone=True).with_variant(
+    SQLITE_DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite"
+)
+
 
 class ModelStatus(str, enum.Enum):
     DEVELOPMENT = "development"
@@ -22,46 +40,77 @@ class ModelType(str, enum.Enum):
     ENSEMBLE = "Ensemble"
 
 
+# Partial indexes below only serve queries that compare status to this
+# literal, see ModelService.get_latest_model
+_PRODUCTION = text("status = 'PRODUCTION'")
+
+
 class ModelRegistryEntry(Base):
     __tablename__ = "model_registry"
+    # One index per ModelService query shape; keep alembic in step
+    __table_args__ = (
+        # list_models keyset pagination, unfiltered and per filter column
+        Index("ix_model_registry_created_at_model_id", "created_at", "model_id"),
+        Index("ix_model_registry_model_type_created_at", "model_type", "created_at", "model_id"),
+        Index("ix_model_registry_domain_created_at", "domain", "created_at", "model_id"),
+        Index("ix_model_registry_status_created_at", "status", "created_at", "model_id"),
+        # get_latest_model: newest production entry, optionally by type/domain
+        Index(
+            "ix_model_registry_production_created_at", "created_at",
+            postgresql_where=_PRODUCTION, sqlite_where=_PRODUCTION
+        ),
+        Index(
+            "ix_model_registry_production_type", "model_type", "created_at",
+            postgresql_where=_PRODUCTION, sqlite_where=_PRODUCTION
+        ),
+        Index(
+            "ix_model_registry_production_type_domain", "model_type", "domain", "created_at",
+            postgresql_where=_PRODUCTION, sqlite_where=_PRODUCTION
+        ),
+        Index(
+            "ix_model_registry_production_domain", "domain", "created_at",
+            postgresql_where=_PRODUCTION, sqlite_where=_PRODUCTION
+        ),
+    )
 
     # Identity fields
-    model_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    model_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     model_name = Column(String(150), nullable=False, index=True)
     display_name = Column(String(200), nullable=False)
 
     # Versioning
     version = Column(String(20), nullable=False)
-    parent_model_id = Column(UUID(as_uuid=True), nullable=True)
+    parent_model_id = Column(Uuid(as_uuid=True), nullable=True, index=True)
     source_repo = Column(String(255), nullable=True)
 
     # Model Type & Category
     model_type = Column(Enum(ModelType), nullable=False)
     domain = Column(String(50), nullable=False)
     tags = Column(Text, nullable=True)
+    tag_rows = relationship("ModelTag", cascade="all, delete-orphan")
 
     # Artifact Details
     artifact_path = Column(String(255), nullable=False)
     model_format = Column(String(50), nullable=False)
-    input_schema = Column(JSONB, nullable=True)
-    output_schema = Column(JSONB, nullable=True)
-    dependencies = Column(JSONB, nullable=True)
+    input_schema = Column(JSONType, nullable=True)
+    output_schema = Column(JSONType, nullable=True)
+    dependencies = Column(JSONType, nullable=True)
 
     # Training Details
     dataset_name = Column(String(150), nullable=True)
     dataset_version = Column(String(50), nullable=True)
-    training_parameters = Column(JSONB, nullable=True)
+    training_parameters = Column(JSONType, nullable=True)
     framework = Column(String(50), nullable=True)
     hardware_used = Column(String(100), nullable=True)
 
     # Performance Metrics
-    metrics = Column(JSONB, nullable=True)
+    metrics = Column(JSONType, nullable=True)
     benchmark_dataset = Column(String(150), nullable=True)
 
     # Lifecycle & Governance
     status = Column(Enum(ModelStatus), nullable=False, default=ModelStatus.DEVELOPMENT)
     created_by = Column(String(100), nullable=False)
-    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    created_at = Column(ServerTimestamp, server_default=func.now())
     last_updated_at = Column(TIMESTAMP(timezone=True), onupdate=func.now())
     reviewer = Column(String(100), nullable=True)
     approval_notes = Column(Text, nullable=True)
@@ -70,25 +119,79 @@ class ModelRegistryEntry(Base):
     checksum = Column(String(64), nullable=False)
     encryption_status = Column(Boolean, default=False)
     signed_by = Column(String(100), nullable=True)
-    access_policy_id = Column(UUID(as_uuid=True), nullable=True)
+    access_policy_id = Column(Uuid(as_uuid=True), nullable=True)
 
     # Runtime Details
     inference_endpoint = Column(String(255), nullable=True)
-    resource_requirements = Column(JSONB, nullable=True)
+    resource_requirements = Column(JSONType, nullable=True)
 
     # Audit & Logs
     last_accessed = Column(TIMESTAMP(timezone=True), nullable=True)
     access_count = Column(Integer, default=0)
-    usage_stats = Column(JSONB, nullable=True)
+    usage_stats = Column(JSONType, nullable=True)
 
     # Environment
     env_type = Column(String(20), nullable=True)
 
 
+# export_query: incremental pulls ordered by when an entry last changed
+Index(
+    "ix_model_registry_changed_at",
+    func.coalesce(ModelRegistryEntry.last_updated_at, ModelRegistryEntry.created_at),
+    ModelRegistryEntry.model_id
+)
+
+# Large JSON documents that ModelService leaves unloaded unless asked for
+HEAVY_COLUMNS = (
+    "input_schema",
+    "output_schema",
+    "dependencies",
+    "training_parameters",
+    "metrics",
+    "resource_requirements",
+    "usage_stats",
+)
+
+
+class ModelTag(Base):
+    """One normalized tag of a registry entry, kept in step with ``tags``."""
+    __tablename__ = "model_tags"
+    __table_args__ = (
+        Index("ix_model_tags_tag_model_id", "tag", "model_id"),
+    )
+
+    model_id = Column(
+        Uuid(as_uuid=True),
+        ForeignKey("model_registry.model_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    tag = Column(String(100), primary_key=True)
+
+
+def parse_tags(tags: Optional[str]) -> List[str]:
+    """Split a comma separated tag string into unique, lower-cased tags."""
+    parsed = []
+    for tag in (tags or "").split(","):
+        tag = tag.strip().lower()[:100]
+        if tag and tag not in parsed:
+            parsed.append(tag)
+    return parsed
+
+
+@event.listens_for(ModelRegistryEntry.tags, "set")
+def _sync_tag_rows(target, value, oldvalue, initiator):
+    wanted = parse_tags(value)
+    for row in list(target.tag_rows):
+        if row.tag not in wanted:
+            target.tag_rows.remove(row)
+    existing = {row.tag for row in target.tag_rows}
+    target.tag_rows.extend(ModelTag(tag=tag) for tag in wanted if tag not in existing)
+
+
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String(100), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
@@ -96,12 +199,33 @@ class User(Base):
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
 
+class ApiKey(Base):
+    """A service credential; only a keyed hash of the key itself is stored."""
+    __tablename__ = "api_keys"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(
+        Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    name = Column(String(100), nullable=False)
+    # Public part of the key, used to find the row and to tell keys apart
+    prefix = Column(String(16), nullable=False, unique=True)
+    # HMAC-SHA256 of the full key under API_KEY_HASH_SECRET
+    key_hash = Column(String(64), nullable=False)
+    scopes = Column(JSONType, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    revoked_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    last_used_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    usage_count = Column(Integer, nullable=False, default=0)
+
+
 class AccessPolicy(Base):
     __tablename__ = "access_policies"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
-    rules = Column(JSONB, nullable=False)
+    rules = Column(JSONType, nullable=False)
     created_by = Column(String(100), nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
\ No newline at end of file
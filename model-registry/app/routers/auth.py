@@ -1,71 +1,80 @@
-from datetime import timedelta
+from typing import List
+from uuid import UUID
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 
-from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import DBSession, get_session, run_db
 from app.core.security import (
-    verify_password,
-    get_password_hash,
-    create_access_token,
-    get_current_active_user
+    authenticate_user,
+    create_account,
+    get_current_active_user,
+    issue_access_token
 )
 from app.models.model import User
-from app.schemas.model import UserCreate, UserResponse, Token
+from app.schemas.model import ApiKeyCreate, ApiKeyCreated, ApiKeyResponse, UserCreate, UserResponse, Token
+from app.services.api_keys import ApiKeyService
 
 router = APIRouter()
 
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        return False
-    if not verify_password(password, user.hashed_password):
-        return False
-    return user
-
-
 @router.post("/register", response_model=UserResponse)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
-        raise HTTPException(
-            status_code=400,
-            detail="Email already registered"
-        )
-
-    hashed_password = get_password_hash(user.password)
-    db_user = User(
-        email=user.email,
-        hashed_password=hashed_password
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-
-    return db_user
+async def register_user(user: UserCreate, db: DBSession = Depends(get_session)):
+    return await create_account(db, user.email, user.password)
 
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": issue_access_token(user), "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserResponse)
-def read_users_me(current_user: User = Depends(get_current_active_user)):
-    return current_user
\ No newline at end of file
+async def read_users_me(current_user: User = Depends(get_current_active_user)):
+    return current_user
+
+
+# API key management is reached with a login token only: required_scope
+# refuses API keys for everything under /auth
+@router.post("/api-keys", response_model=ApiKeyCreated, status_code=status.HTTP_201_CREATED)
+async def create_api_key(
+    api_key: ApiKeyCreate,
+    db: DBSession = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    created, key = await run_db(
+        db,
+        lambda session: ApiKeyService(session).create_key(
+            current_user.id, api_key.name, [scope.value for scope in api_key.scopes], api_key.expires_in_days
+        )
+    )
+    return ApiKeyCreated(**ApiKeyResponse.model_validate(created).model_dump(), key=key)
+
+
+@router.get("/api-keys", response_model=List[ApiKeyResponse])
+async def list_api_keys(
+    db: DBSession = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    return await run_db(db, lambda session: ApiKeyService(session).list_keys(current_user.id))
+
+
+@router.delete("/api-keys/{key_id}")
+async def revoke_api_key(
+    key_id: UUID,
+    db: DBSession = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    revoked = await run_db(db, lambda session: ApiKeyService(session).revoke_key(current_user.id, key_id))
+    if not revoked:
+        raise HTTPException(status_code=404, detail="API key not found")
+    return {"message": "API key revoked"}
@@ -1,26 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import DBSession, get_session
+from app.core.etag import conditional_entry
 from app.core.security import get_current_active_user
-from app.models.model import User
-from app.services.model_service import ModelService
+from app.models.model import ModelRegistryEntry, User
+from app.schemas.model import VERSION_FIELDS
+from app.services.access_accumulator import access_accumulator
+from app.services.async_model_service import AsyncModelService
 
 router = APIRouter()
 
+METRICS_FIELDS = ("metrics", "usage_stats", "access_count", "last_accessed")
 
-@router.get("/{model_id}")
-def get_model_metrics(
-    model_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    service = ModelService(db)
-    model = service.get_model_by_id(model_id)
-    if not model:
-        raise HTTPException(status_code=404, detail="Model not found")
 
+def metrics_dict(model_id: UUID, model: ModelRegistryEntry) -> Dict[str, Any]:
     return {
         "model_id": model_id,
         "metrics": model.metrics,
@@ -30,14 +27,41 @@ def get_model_metrics(
     }
 
 
+@router.get("/{model_id}")
+async def get_model_metrics(
+    request: Request,
+    model_id: UUID,
+    db: DBSession = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    service = AsyncModelService(db)
+    response = await conditional_entry(
+        request,
+        lambda fields: service.get_model_by_id(model_id, fields),
+        METRICS_FIELDS,
+        lambda model: metrics_dict(model_id, model)
+    )
+    if response is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return response
+
+
 @router.post("/{model_id}/access")
-def record_model_access(
+async def record_model_access(
     model_id: UUID,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = ModelService(db)
-    success = service.record_access(model_id)
+    service = AsyncModelService(db)
+    if settings.ACCESS_BATCHING_ENABLED:
+        # Existence from the model cache: a lookup per model and flush,
+        # not per access, and unknown ids never reach the accumulator
+        if await service.get_model_by_id(model_id, VERSION_FIELDS) is None:
+            raise HTTPException(status_code=404, detail="Model not found")
+        access_accumulator.record(model_id)
+        return {"message": "Access recorded"}
+
+    success = await service.record_access(model_id)
     if not success:
         raise HTTPException(status_code=404, detail="Model not found")
     return {"message": "Access recorded"}
\ No newline at end of file
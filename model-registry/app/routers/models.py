@@ -1,150 +1,484 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import DBSession, get_session
+from app.core.etag import conditional_entry, etag_matches, not_modified, page_etag
 from app.core.security import get_current_active_user
-from app.models.model import ModelRegistryEntry, User, ModelStatus, ModelType
+from app.core.serialization import SEARCH_FIELDS, FastJSONResponse, entry_dict, page_dict
+from app.models.model import User, ModelStatus, ModelType, parse_tags
 from app.schemas.model import (
     ModelCreate,
     ModelResponse,
     ModelUpdate,
-    ModelListResponse
+    ModelListResponse,
+    SearchResponse,
+    CountStrategy,
+    TagCount,
+    TagMatch,
+    BatchMode,
+    ArtifactDownloadMode,
+    BatchItemResult,
+    BatchRegisterResponse,
+    ExportFormat,
+    MODEL_FIELDS,
+    ModelView,
+    select_fields
 )
-from app.services.model_service import ModelService
+from app.services.artifacts import (
+    ArtifactStorage,
+    ChecksumMismatchError,
+    RangeNotSatisfiableError,
+    byte_range,
+    get_artifact_storage
+)
+from app.services.async_model_service import AsyncModelService
+from app.services.export import csv_lines, ndjson_lines
+from app.services.model_service import BatchRejectedError
+from app.services.pagination import InvalidCursorError
 
 router = APIRouter()
 
 
+def _selected_fields(fields: Optional[str], view: ModelView) -> Optional[List[str]]:
+    try:
+        return select_fields(fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/register", response_model=ModelResponse)
-def register_model(
+async def register_model(
     model: ModelCreate,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = ModelService(db)
-    return service.register_model(model, current_user.email)
+    service = AsyncModelService(db)
+    return await service.register_model(model, current_user.email)
 
 
-@router.get("/{model_id}", response_model=ModelResponse)
-def get_model(
-    model_id: UUID,
-    db: Session = Depends(get_db),
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonlines")
+
+
+def _parse_line(line: bytes, keep_malformed: bool) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        if not keep_malformed:
+            raise
+        return e
+
+
+async def _read_batch_items(request: Request, keep_malformed: bool = False) -> List[Any]:
+    """Parse a JSON array body, or an NDJSON stream read line by line.
+
+    With ``keep_malformed`` an NDJSON line that is not valid JSON stands in
+    the list as its ``ValueError`` instead of failing the whole body.
+    """
+    items: List[Any] = []
+    try:
+        if request.headers.get("content-type", "").split(";")[0].strip() in NDJSON_TYPES:
+            buffer = b""
+            async for chunk in request.stream():
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                items.extend(_parse_line(line, keep_malformed) for line in lines if line.strip())
+                if len(items) > settings.BULK_REGISTER_MAX_ITEMS:
+                    break
+            if buffer.strip():
+                items.append(_parse_line(buffer, keep_malformed))
+        else:
+            items = await request.json()
+            if not isinstance(items, list):
+                raise HTTPException(status_code=400, detail="Expected a JSON array of models")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed request body: {e}")
+
+    if len(items) > settings.BULK_REGISTER_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_REGISTER_MAX_ITEMS} models per batch"
+        )
+    return items
+
+
+@router.post("/register/batch", response_model=BatchRegisterResponse)
+async def register_models_batch(
+    request: Request,
+    mode: BatchMode = Query(BatchMode.ATOMIC, description="atomic: all or nothing; partial: keep the valid items"),
+    db: DBSession = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = ModelService(db)
-    model = service.get_model_by_id(model_id)
-    if not model:
-        raise HTTPException(status_code=404, detail="Model not found")
-    return model
+    items = await _read_batch_items(request, keep_malformed=mode == BatchMode.PARTIAL)
+
+    valid: List[ModelCreate] = []
+    valid_indexes: List[int] = []
+    results: List[BatchItemResult] = []
+    for index, item in enumerate(items):
+        if isinstance(item, ValueError):
+            results.append(BatchItemResult(index=index, status="failed", errors=[f"Malformed JSON: {item}"]))
+            continue
+        if not isinstance(item, dict):
+            results.append(BatchItemResult(index=index, status="failed", errors=["Each item must be a JSON object"]))
+            continue
+        try:
+            valid.append(ModelCreate(**item))
+            valid_indexes.append(index)
+        except ValidationError as e:
+            results.append(BatchItemResult(
+                index=index,
+                status="failed",
+                errors=e.errors(include_url=False, include_context=False)
+            ))
+
+    if results and mode == BatchMode.ATOMIC:
+        raise HTTPException(
+            status_code=422,
+            detail=[result.model_dump(exclude_none=True) for result in results]
+        )
+
+    service = AsyncModelService(db)
+    try:
+        outcomes = await service.register_models(
+            valid,
+            current_user.email,
+            atomic=mode == BatchMode.ATOMIC,
+            chunk_size=settings.BULK_INSERT_CHUNK_SIZE
+        )
+    except BatchRejectedError as e:
+        rejected = [
+            BatchItemResult(index=valid_indexes[position], status="failed", errors=[error])
+            for position, error in sorted(e.errors.items())
+        ]
+        raise HTTPException(
+            status_code=409,
+            detail=[result.model_dump(exclude_none=True) for result in rejected]
+        )
+    for index, outcome in zip(valid_indexes, outcomes):
+        if isinstance(outcome, str):
+            results.append(BatchItemResult(index=index, status="failed", errors=[outcome]))
+        else:
+            results.append(BatchItemResult(index=index, status="created", model_id=outcome.model_id))
+    results.sort(key=lambda result: result.index)
+
+    created = sum(result.status == "created" for result in results)
+    return BatchRegisterResponse(
+        mode=mode,
+        created=created,
+        failed=len(results) - created,
+        results=results
+    )
 
 
 @router.get("/latest", response_model=ModelResponse)
-def get_latest_model(
+async def get_latest_model(
+    request: Request,
     model_type: Optional[ModelType] = Query(None),
     domain: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = ModelService(db)
-    model = service.get_latest_model(model_type, domain)
-    if not model:
+    service = AsyncModelService(db)
+    response = await conditional_entry(
+        request,
+        lambda fields: service.get_latest_model(model_type, domain, fields),
+        MODEL_FIELDS,
+        entry_dict
+    )
+    if response is None:
         raise HTTPException(status_code=404, detail="No models found")
-    return model
+    return response
 
 
 @router.post("/promote/{model_id}")
-def promote_model(
+async def promote_model(
     model_id: UUID,
     target_status: ModelStatus,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = ModelService(db)
-    success = service.promote_model(model_id, target_status, current_user.email)
+    service = AsyncModelService(db)
+    success = await service.promote_model(model_id, target_status, current_user.email)
     if not success:
         raise HTTPException(status_code=404, detail="Model not found")
     return {"message": f"Model promoted to {target_status.value}"}
 
 
 @router.get("/", response_model=ModelListResponse)
-def list_models(
+async def list_models(
+    request: Request,
     model_type: Optional[ModelType] = Query(None),
     domain: Optional[str] = Query(None),
     status: Optional[ModelStatus] = Query(None),
-    tags: Optional[str] = Query(None),
+    tags: Optional[str] = Query(None, description="Comma separated tags"),
+    tag: List[str] = Query([], description="Tag filter, may be repeated"),
+    tag_match: TagMatch = Query(TagMatch.ALL, description="Require all or any of the tags"),
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    count: CountStrategy = Query(CountStrategy.EXACT, description="How `total` is computed"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+    view: ModelView = Query(ModelView.FULL, description="full, or the compact summary"),
+    db: DBSession = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = ModelService(db)
-    models, total = service.list_models(
+    selected = _selected_fields(fields, view)
+    service = AsyncModelService(db)
+    try:
+        models, total, next_cursor = await service.list_models(
+            model_type=model_type,
+            domain=domain,
+            status=status,
+            tags=tag + parse_tags(tags),
+            tag_match=tag_match,
+            page=page,
+            size=size,
+            cursor=cursor,
+            count=count,
+            fields=selected or MODEL_FIELDS
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    selected = selected or MODEL_FIELDS
+    etag = page_etag(models, selected, total, page, size, next_cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return FastJSONResponse(
+        page_dict(models, selected, total, page, size, count, next_cursor),
+        headers={"ETag": etag}
+    )
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: (ndjson_lines, "application/x-ndjson"),
+    ExportFormat.CSV: (csv_lines, "text/csv"),
+}
+
+
+@router.get("/export")
+async def export_models(
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    model_type: Optional[ModelType] = Query(None),
+    domain: Optional[str] = Query(None),
+    status: Optional[ModelStatus] = Query(None),
+    tags: Optional[str] = Query(None, description="Comma separated tags"),
+    tag: List[str] = Query([], description="Tag filter, may be repeated"),
+    tag_match: TagMatch = Query(TagMatch.ALL, description="Require all or any of the tags"),
+    since: Optional[datetime] = Query(None, description="Only entries created or updated at or after this time"),
+    db: DBSession = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    service = AsyncModelService(db)
+    batches = service.export_models(
         model_type=model_type,
         domain=domain,
         status=status,
-        tags=tags,
-        page=page,
-        size=size
+        tags=tag + parse_tags(tags),
+        tag_match=tag_match,
+        since=since,
+        batch_size=settings.EXPORT_BATCH_SIZE
     )
-    return ModelListResponse(
-        models=models,
-        total=total,
-        page=page,
-        size=size
+    serialize, media_type = EXPORT_MEDIA_TYPES[format]
+    return StreamingResponse(
+        serialize(batches),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="models.{format.value}"'}
     )
 
 
-@router.get("/search")
-def search_models(
+@router.get("/search", response_model=SearchResponse)
+async def search_models(
+    request: Request,
     q: str = Query(..., description="Search query"),
     domain: Optional[str] = Query(None),
     model_type: Optional[ModelType] = Query(None),
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    count: CountStrategy = Query(CountStrategy.EXACT, description="How `total` is computed"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+    view: ModelView = Query(ModelView.FULL, description="full, or the compact summary"),
+    db: DBSession = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = ModelService(db)
-    models, total = service.search_models(
-        query=q,
-        domain=domain,
-        model_type=model_type,
-        page=page,
-        size=size
+    selected = _selected_fields(fields, view)
+    service = AsyncModelService(db)
+    try:
+        models, total, next_cursor = await service.search_models(
+            query=q,
+            domain=domain,
+            model_type=model_type,
+            page=page,
+            size=size,
+            cursor=cursor,
+            count=count,
+            fields=selected or MODEL_FIELDS
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    selected = [*(selected or MODEL_FIELDS), *SEARCH_FIELDS]
+    etag = page_etag(models, selected, [model.score for model in models], total, page, size, next_cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return FastJSONResponse(
+        page_dict(models, selected, total, page, size, count, next_cursor),
+        headers={"ETag": etag}
     )
-    return ModelListResponse(
-        models=models,
-        total=total,
-        page=page,
-        size=size
+
+
+@router.get("/tags", response_model=List[TagCount])
+async def list_tags(
+    limit: int = Query(100, ge=1, le=1000),
+    db: DBSession = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    service = AsyncModelService(db)
+    return [TagCount(tag=tag, count=count) for tag, count in await service.tag_counts(limit)]
+
+
+@router.get("/{model_id}", response_model=ModelResponse)
+async def get_model(
+    request: Request,
+    model_id: UUID,
+    fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+    view: ModelView = Query(ModelView.FULL, description="full, or the compact summary"),
+    db: DBSession = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    selected = _selected_fields(fields, view) or MODEL_FIELDS
+    service = AsyncModelService(db)
+    response = await conditional_entry(
+        request,
+        lambda fields: service.get_model_by_id(model_id, fields),
+        selected,
+        lambda model: entry_dict(model, selected)
     )
+    if response is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return response
 
 
 @router.put("/{model_id}", response_model=ModelResponse)
-def update_model(
+async def update_model(
     model_id: UUID,
     model_update: ModelUpdate,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = ModelService(db)
-    updated_model = service.update_model(model_id, model_update)
+    service = AsyncModelService(db)
+    updated_model = await service.update_model(model_id, model_update)
     if not updated_model:
         raise HTTPException(status_code=404, detail="Model not found")
     return updated_model
 
 
 @router.delete("/{model_id}")
-def delete_model(
+async def delete_model(
     model_id: UUID,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    service = ModelService(db)
-    success = service.delete_model(model_id)
+    service = AsyncModelService(db)
+    success = await service.delete_model(model_id)
     if not success:
         raise HTTPException(status_code=404, detail="Model not found")
-    return {"message": "Model deleted successfully"}
\ No newline at end of file
+    return {"message": "Model deleted successfully"}
+
+@router.post("/{model_id}/artifact", response_model=ModelResponse)
+async def upload_artifact(
+    request: Request,
+    model_id: UUID,
+    db: DBSession = Depends(get_session),
+    current_user: User = Depends(get_current_active_user),
+    storage: ArtifactStorage = Depends(get_artifact_storage)
+):
+    """Stream the request body into artifact storage.
+
+    The body is verified against the entry's ``checksum`` (SHA-256) while
+    it is stored; ``artifact_path`` only changes once it matched.
+    """
+    service = AsyncModelService(db)
+    model = await service.get_model_by_id(model_id, ("checksum",))
+    if model is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+
+    try:
+        stored = await storage.upload(model_id, request.stream(), expected_sha256=model.checksum)
+    except ChecksumMismatchError as e:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": "Artifact does not match the model checksum", "expected": e.expected, "actual": e.actual}
+        )
+
+    updated = await service.set_artifact(model_id, stored.path, stored.sha256)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return updated
+
+
+@router.get("/{model_id}/artifact")
+async def download_artifact(
+    request: Request,
+    model_id: UUID,
+    mode: Optional[ArtifactDownloadMode] = Query(None, description="redirect or proxy, default ARTIFACT_DOWNLOAD_MODE"),
+    db: DBSession = Depends(get_session),
+    current_user: User = Depends(get_current_active_user),
+    storage: ArtifactStorage = Depends(get_artifact_storage)
+):
+    """Download the artifact uploaded through ``POST /models/{id}/artifact``.
+
+    ``redirect`` has the client fetch the bytes without passing through
+    the API: a 307 to a short-lived presigned URL on S3, an
+    ``X-Accel-Redirect`` to the front proxy on the local backend when
+    configured. Otherwise, and with ``proxy``, the API serves them, with
+    single ``Range`` requests answered 206 for parallel and resumed
+    downloads.
+    """
+    service = AsyncModelService(db)
+    model = await service.get_model_by_id(model_id, ("artifact_path",))
+    if model is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    key = storage.key_from_path(model.artifact_path)
+    if key is None:
+        raise HTTPException(status_code=404, detail="Model has no artifact stored in the registry")
+
+    mode = mode or ArtifactDownloadMode(settings.ARTIFACT_DOWNLOAD_MODE)
+    if mode == ArtifactDownloadMode.REDIRECT:
+        redirect = await run_in_threadpool(storage.redirect, key)
+        if redirect is not None:
+            await service.record_download(model_id)
+            return redirect
+
+    info = await run_in_threadpool(storage.info, key)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Artifact missing from storage")
+    headers = {"Accept-Ranges": "bytes"}
+    if info.etag:
+        headers["ETag"] = info.etag
+    if info.size == 0:
+        await service.record_download(model_id, 0, 0.0)
+        return Response(status_code=200, headers=headers, media_type="application/octet-stream")
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range != info.etag:
+        # The artifact changed since the client's first chunk: send all of it
+        range_header = None
+    try:
+        requested = byte_range(range_header, info.size)
+    except RangeNotSatisfiableError:
+        raise HTTPException(
+            status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{info.size}"}
+        )
+
+    start, end = requested or (0, info.size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if requested:
+        headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+    return storage.send(model_id, key, start, end, 206 if requested else 200, headers)
@@ -1,12 +1,28 @@
 from typing import Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Request, Form, HTTPException
+from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import RedirectResponse, HTMLResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from fastapi.templating import Jinja2Templates
-import httpx
-
-
-API_BASE = "http://localhost:8000"
+from pydantic import ValidationError
+
+from app.core.database import DBSession, get_session
+from app.core.security import (
+    authenticate_user,
+    create_account,
+    get_current_active_user,
+    get_current_user,
+    issue_access_token
+)
+from app.core.serialization import entry_dict, plain
+from app.models.model import User
+from app.routers.metrics import METRICS_FIELDS, metrics_dict
+from app.schemas.model import MODEL_FIELDS, SUMMARY_FIELDS, CountStrategy, ModelCreate, UserCreate, UserResponse
+from app.services.async_model_service import AsyncModelService
+
+# Pages call the services in-process with the session's token, resolved by
+# the same helpers as the API; no loopback HTTP request per page view
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -17,6 +33,22 @@ def get_token_from_session(request: Request) -> Optional[str]:
     return token
 
 
+async def get_session_user(request: Request, db: DBSession) -> Optional[User]:
+    """User behind the session's token; None where the API would answer 401."""
+    token = get_token_from_session(request)
+    if not token:
+        return None
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    try:
+        return await get_current_active_user(await get_current_user(request, credentials, None, db))
+    except HTTPException:
+        return None
+
+
+def _validation_error(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors())
+
+
 @router.get("/", response_class=HTMLResponse)
 async def ui_home(request: Request, view: Optional[str] = None):
     # Landing page with split layout; shows login by default or register when view=register
@@ -30,18 +62,19 @@ async def login_page(request: Request):
 
 
 @router.post("/login")
-async def login_action(request: Request, username: str = Form(...), password: str = Form(...)):
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(f"{API_BASE}/auth/token", data={"username": username, "password": password})
-            resp.raise_for_status()
-        except httpx.HTTPStatusError:
-            # Return to landing with error
-            return templates.TemplateResponse("index.html", {"request": request, "view": "login", "error": "Invalid credentials"}, status_code=400)
-
-        data = resp.json()
-        request.session["access_token"] = data.get("access_token")
-        return RedirectResponse(url="/ui/dashboard", status_code=303)
+async def login_action(
+    request: Request,
+    username: str = Form(...),
+    password: str = Form(...),
+    db: DBSession = Depends(get_session)
+):
+    user = await authenticate_user(db, username, password)
+    if not user:
+        # Return to landing with error
+        return templates.TemplateResponse("index.html", {"request": request, "view": "login", "error": "Invalid credentials"}, status_code=400)
+
+    request.session["access_token"] = issue_access_token(user)
+    return RedirectResponse(url="/ui/dashboard", status_code=303)
 
 
 @router.get("/register", response_class=HTMLResponse)
@@ -50,31 +83,26 @@ async def register_page(request: Request):
 
 
 @router.post("/register")
-async def register_action(request: Request, email: str = Form(...), password: str = Form(...)):
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(f"{API_BASE}/auth/register", json={"email": email, "password": password})
-            resp.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            # Avoid JSON parse if backend returned HTML/plain
-            error_text = None
-            if e.response is not None:
-                try:
-                    error_text = e.response.json().get("detail")
-                except Exception:
-                    error_text = e.response.text or "Registration failed"
-            error = error_text or "Registration failed"
-            return templates.TemplateResponse("index.html", {"request": request, "view": "register", "error": error}, status_code=400)
-
-    # Auto-login after successful registration
+async def register_action(
+    request: Request,
+    email: str = Form(...),
+    password: str = Form(...),
+    db: DBSession = Depends(get_session)
+):
     try:
-        login_resp = await client.post(f"{API_BASE}/auth/token", data={"username": email, "password": password})
-        login_resp.raise_for_status()
-        token_data = login_resp.json()
-        request.session["access_token"] = token_data.get("access_token")
+        form = UserCreate(email=email, password=password)
+        user = await create_account(db, form.email, form.password)
+    except ValidationError as e:
+        error = _validation_error(e)
+    except HTTPException as e:
+        if e.status_code != 400:
+            raise
+        error = e.detail
+    else:
+        # Auto-login after successful registration
+        request.session["access_token"] = issue_access_token(user)
         return RedirectResponse(url="/ui/dashboard", status_code=303)
-    except Exception:
-        return RedirectResponse(url="/ui/?view=login", status_code=303)
+    return templates.TemplateResponse("index.html", {"request": request, "view": "register", "error": error}, status_code=400)
 
 
 @router.post("/logout")
@@ -84,38 +112,31 @@ async def logout_action(request: Request):
 
 
 @router.get("/dashboard", response_class=HTMLResponse)
-async def dashboard(request: Request):
-    token = get_token_from_session(request)
-    if not token:
+async def dashboard(request: Request, db: DBSession = Depends(get_session)):
+    if not get_token_from_session(request):
         return RedirectResponse(url="/ui/?view=login", status_code=303)
-    # Optionally fetch current user info to display on dashboard
-    headers = {"Authorization": f"Bearer {token}"}
-    current_user = None
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(f"{API_BASE}/auth/me", headers=headers, timeout=5)
-            if resp.status_code == 200:
-                current_user = resp.json()
-        except Exception:
-            pass
+    # Current user info to display on dashboard, if the token is still valid
+    user = await get_session_user(request, db)
+    current_user = plain(UserResponse.model_validate(user).model_dump()) if user else None
     return templates.TemplateResponse("dashboard.html", {"request": request, "user": current_user})
 
 
 # Models
 @router.get("/models", response_class=HTMLResponse)
-async def models_list(request: Request, page: int = 1, size: int = 20):
-    token = get_token_from_session(request)
-    if not token:
+async def models_list(request: Request, page: int = 1, size: int = 20, db: DBSession = Depends(get_session)):
+    if not await get_session_user(request, db):
         return RedirectResponse(url="/ui/login", status_code=303)
 
-    headers = {"Authorization": f"Bearer {token}"}
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(f"{API_BASE}/models/", params={"page": page, "size": size}, headers=headers)
-        if resp.status_code == 401:
-            return RedirectResponse(url="/ui/login", status_code=303)
-        resp.raise_for_status()
-        payload = resp.json()
-
+    size = min(max(size, 1), 100)
+    models, total, _ = await AsyncModelService(db).list_models(
+        page=max(page, 1), size=size, count=CountStrategy.EXACT, fields=SUMMARY_FIELDS
+    )
+    payload = {
+        "models": plain([entry_dict(entry, SUMMARY_FIELDS) for entry in models]),
+        "total": total,
+        "page": page,
+        "size": size,
+    }
     return templates.TemplateResponse("models/list.html", {"request": request, **payload})
 
 
@@ -139,80 +160,55 @@ async def model_create(
     model_format: str = Form(...),
     checksum: str = Form(...),
     tags: Optional[str] = Form(None),
+    db: DBSession = Depends(get_session)
 ):
-    token = get_token_from_session(request)
-    if not token:
+    user = await get_session_user(request, db)
+    if not user:
         return RedirectResponse(url="/ui/login", status_code=303)
 
-    headers = {"Authorization": f"Bearer {token}"}
-    payload = {
-        "model_name": model_name,
-        "display_name": display_name,
-        "version": version,
-        "model_type": model_type,
-        "domain": domain,
-        "artifact_path": artifact_path,
-        "model_format": model_format,
-        "checksum": checksum,
-        "tags": tags,
-    }
-
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(f"{API_BASE}/models/register", json=payload, headers=headers)
-        if resp.status_code == 401:
-            return RedirectResponse(url="/ui/login", status_code=303)
-        if resp.status_code >= 400:
-            error = resp.json().get("detail", "Failed to create model")
-            return templates.TemplateResponse("models/new.html", {"request": request, "error": error}, status_code=400)
-
+    try:
+        model = ModelCreate(
+            model_name=model_name,
+            display_name=display_name,
+            version=version,
+            model_type=model_type,
+            domain=domain,
+            artifact_path=artifact_path,
+            model_format=model_format,
+            checksum=checksum,
+            tags=tags,
+        )
+    except ValidationError as e:
+        return templates.TemplateResponse("models/new.html", {"request": request, "error": _validation_error(e)}, status_code=400)
+
+    await AsyncModelService(db).register_model(model, user.email)
     return RedirectResponse(url="/ui/models", status_code=303)
 
 
 @router.get("/models/{model_id}", response_class=HTMLResponse)
-async def model_detail(request: Request, model_id: str):
-    token = get_token_from_session(request)
-    if not token:
+async def model_detail(request: Request, model_id: UUID, db: DBSession = Depends(get_session)):
+    if not await get_session_user(request, db):
         return RedirectResponse(url="/ui/login", status_code=303)
-    headers = {"Authorization": f"Bearer {token}"}
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(f"{API_BASE}/models/{model_id}", headers=headers)
-        if resp.status_code == 401:
-            return RedirectResponse(url="/ui/login", status_code=303)
-        if resp.status_code == 404:
-            raise HTTPException(status_code=404, detail="Model not found")
-        resp.raise_for_status()
-        model = resp.json()
-    return templates.TemplateResponse("models/detail.html", {"request": request, "model": model})
+    model = await AsyncModelService(db).get_model_by_id(model_id, MODEL_FIELDS)
+    if model is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return templates.TemplateResponse("models/detail.html", {"request": request, "model": plain(entry_dict(model))})
 
 
 @router.post("/models/{model_id}/delete")
-async def model_delete(request: Request, model_id: str):
-    token = get_token_from_session(request)
-    if not token:
+async def model_delete(request: Request, model_id: UUID, db: DBSession = Depends(get_session)):
+    if not await get_session_user(request, db):
         return RedirectResponse(url="/ui/login", status_code=303)
-    headers = {"Authorization": f"Bearer {token}"}
-    async with httpx.AsyncClient() as client:
-        resp = await client.delete(f"{API_BASE}/models/{model_id}", headers=headers)
-        if resp.status_code == 401:
-            return RedirectResponse(url="/ui/login", status_code=303)
+    await AsyncModelService(db).delete_model(model_id)
     return RedirectResponse(url="/ui/models", status_code=303)
 
 
 # Metrics
 @router.get("/models/{model_id}/metrics", response_class=HTMLResponse)
-async def model_metrics(request: Request, model_id: str):
-    token = get_token_from_session(request)
-    if not token:
+async def model_metrics(request: Request, model_id: UUID, db: DBSession = Depends(get_session)):
+    if not await get_session_user(request, db):
         return RedirectResponse(url="/ui/login", status_code=303)
-    headers = {"Authorization": f"Bearer {token}"}
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(f"{API_BASE}/metrics/{model_id}", headers=headers)
-        if resp.status_code == 401:
-            return RedirectResponse(url="/ui/login", status_code=303)
-        if resp.status_code == 404:
-            raise HTTPException(status_code=404, detail="Model not found")
-        resp.raise_for_status()
-        data = resp.json()
-    return templates.TemplateResponse("models/metrics.html", {"request": request, **data})
-
-
+    model = await AsyncModelService(db).get_model_by_id(model_id, METRICS_FIELDS)
+    if model is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return templates.TemplateResponse("models/metrics.html", {"request": request, **plain(metrics_dict(model_id, model))})
@@ -1,3 +1,5 @@
+import enum
+
 from pydantic import BaseModel, Field, EmailStr
 from typing import Optional, Dict, Any, List
 from datetime import datetime
@@ -81,11 +83,112 @@ class ModelResponse(ModelBase):
         from_attributes = True
 
 
+class CountStrategy(str, enum.Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+class TagMatch(str, enum.Enum):
+    ALL = "all"
+    ANY = "any"
+
+
+MODEL_FIELDS = tuple(ModelResponse.model_fields)
+
+SUMMARY_FIELDS = (
+    "model_id",
+    "model_name",
+    "display_name",
+    "version",
+    "model_type",
+    "domain",
+    "status",
+    "tags",
+    "created_at",
+    "last_updated_at",
+)
+
+
+# Columns an ETag is derived from; always loaded alongside requested fields
+VERSION_FIELDS = ("model_id", "created_at", "last_updated_at", "access_count", "last_accessed")
+
+
+class ModelView(str, enum.Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+
+def select_fields(fields: Optional[str], view: ModelView = ModelView.FULL) -> Optional[List[str]]:
+    """Resolve ``fields=``/``view=`` to the ``ModelResponse`` fields to return.
+
+    Returns ``None`` for the full representation. An explicit ``fields``
+    list wins over ``view``; ``model_id`` is always included.
+    """
+    if fields:
+        selected = ["model_id"]
+        for field in fields.split(","):
+            field = field.strip()
+            if field not in MODEL_FIELDS:
+                raise ValueError(f"Unknown field: {field}")
+            if field not in selected:
+                selected.append(field)
+        return selected
+    if view == ModelView.SUMMARY:
+        return list(SUMMARY_FIELDS)
+    return None
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+
 class ModelListResponse(BaseModel):
     models: List[ModelResponse]
-    total: int
+    total: Optional[int]
+    count_strategy: CountStrategy = CountStrategy.EXACT
     page: int
     size: int
+    next_cursor: Optional[str] = None
+
+
+class SearchResult(ModelResponse):
+    score: Optional[float] = None
+    highlights: Dict[str, str] = {}
+
+
+class SearchResponse(ModelListResponse):
+    models: List[SearchResult]
+
+
+class BatchMode(str, enum.Enum):
+    ATOMIC = "atomic"
+    PARTIAL = "partial"
+
+
+class ArtifactDownloadMode(str, enum.Enum):
+    REDIRECT = "redirect"
+    PROXY = "proxy"
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    status: str
+    model_id: Optional[UUID] = None
+    errors: Optional[List[Any]] = None
+
+
+class BatchRegisterResponse(BaseModel):
+    mode: BatchMode
+    created: int
+    failed: int
+    results: List[BatchItemResult]
 
 
 class UserBase(BaseModel):
@@ -115,6 +218,39 @@ class TokenData(BaseModel):
     email: Optional[str] = None
 
 
+class ApiKeyScope(str, enum.Enum):
+    MODELS_READ = "models:read"
+    MODELS_WRITE = "models:write"
+    METRICS_READ = "metrics:read"
+    METRICS_WRITE = "metrics:write"
+
+
+class ApiKeyCreate(BaseModel):
+    name: str = Field(..., max_length=100)
+    scopes: List[ApiKeyScope] = Field(default=[ApiKeyScope.MODELS_READ, ApiKeyScope.METRICS_READ])
+    expires_in_days: Optional[int] = Field(default=None, ge=1, le=3650)
+
+
+class ApiKeyResponse(BaseModel):
+    id: UUID
+    name: str
+    prefix: str
+    scopes: List[str]
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+    revoked_at: Optional[datetime] = None
+    last_used_at: Optional[datetime] = None
+    usage_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class ApiKeyCreated(ApiKeyResponse):
+    """Returned once on creation; ``key`` is not stored and cannot be shown again."""
+    key: str
+
+
 class AccessPolicyCreate(BaseModel):
     name: str = Field(..., max_length=100)
     description: Optional[str] = None
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.telemetry import (
+    ACCESS_FLUSH_DURATION,
+    ACCESS_FLUSH_LAG,
+    ACCESS_FLUSHED_MODELS,
+    ACCESS_PENDING_MODELS,
+)
+from app.services.model_service import ModelService
+
+logger = logging.getLogger(__name__)
+
+
+Counts = Dict[UUID, Tuple[int, datetime]]
+
+
+def _increment_model_access(db: Session, counts: Counts) -> int:
+    return ModelService(db).increment_access_counts(counts)
+
+
+class AccessAccumulator:
+    """Coalesces access events in memory and writes them in batches.
+
+    ``record`` only touches a dict; a background thread flushes the pending
+    ``(count, last_accessed)`` per id every ``interval`` seconds, or as
+    soon as ``max_pending`` distinct ids are waiting, through ``write``
+    (by default :meth:`ModelService.increment_access_counts`).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: float = 5.0,
+        max_pending: int = 1000,
+        write: Callable[[Session, Counts], int] = _increment_model_access,
+        name: str = "model_access"
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_pending = max_pending
+        self.write = write
+        self.name = name
+        self._pending: Counts = {}
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, model_id: UUID) -> None:
+        with self._lock:
+            count, _ = self._pending.get(model_id, (0, None))
+            self._pending[model_id] = (count + 1, datetime.utcnow())
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            pending = len(self._pending)
+        ACCESS_PENDING_MODELS.labels(self.name).set(pending)
+        if pending >= self.max_pending:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything pending now; returns the number of rows updated."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                oldest, self._oldest = self._oldest, None
+            ACCESS_PENDING_MODELS.labels(self.name).set(0)
+            if not batch:
+                return 0
+
+            started = time.monotonic()
+            db = self.session_factory()
+            try:
+                updated = self.write(db, batch)
+            except Exception:
+                db.rollback()
+                self._requeue(batch, oldest)
+                raise
+            finally:
+                db.close()
+
+            finished = time.monotonic()
+            ACCESS_FLUSH_DURATION.labels(self.name).observe(finished - started)
+            ACCESS_FLUSH_LAG.labels(self.name).observe(finished - oldest)
+            ACCESS_FLUSHED_MODELS.labels(self.name).inc(len(batch))
+            return updated
+
+    def _requeue(self, batch: Counts, oldest: float) -> None:
+        with self._lock:
+            for model_id, (count, accessed_at) in batch.items():
+                pending_count, pending_at = self._pending.get(model_id, (0, accessed_at))
+                self._pending[model_id] = (count + pending_count, max(accessed_at, pending_at))
+            self._oldest = min(oldest, self._oldest or oldest)
+            ACCESS_PENDING_MODELS.labels(self.name).set(len(self._pending))
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush %s counts", self.name)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-accumulator", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write whatever is still pending."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+access_accumulator = AccessAccumulator(
+    SessionLocal,
+    interval=settings.ACCESS_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.ACCESS_FLUSH_MAX_PENDING
+)
@@ -0,0 +1,159 @@
+import hashlib
+import hmac
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.principals import ValidatedKey
+from app.core.routing import read_only, writes
+from app.models.model import ApiKey, User
+from app.schemas.model import ApiKeyScope
+from app.services.access_accumulator import AccessAccumulator
+
+# Keys look like mr_<prefix>_<secret>; the prefix is stored in clear
+API_KEY_PREFIX = "mr_"
+SCOPES = frozenset(scope.value for scope in ApiKeyScope)
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+_HASH_SECRET = (settings.API_KEY_HASH_SECRET or settings.SECRET_KEY).encode()
+
+
+def generate_api_key() -> Tuple[str, str]:
+    """A new ``(prefix, key)`` pair."""
+    prefix = secrets.token_hex(6)
+    return prefix, f"{API_KEY_PREFIX}{prefix}_{secrets.token_urlsafe(32)}"
+
+
+def parse_prefix(key: str) -> Optional[str]:
+    if not key.startswith(API_KEY_PREFIX):
+        return None
+    prefix, _, secret = key[len(API_KEY_PREFIX):].partition("_")
+    return prefix if prefix and secret else None
+
+
+def hash_api_key(key: str) -> str:
+    """HMAC-SHA256 of ``key``: keys carry 256 bits of entropy, so a keyed
+    fast hash is as safe as bcrypt here and costs about a microsecond."""
+    return hmac.new(_HASH_SECRET, key.encode(), hashlib.sha256).hexdigest()
+
+
+def required_scope(method: str, path: str) -> Optional[str]:
+    """Scope an API key needs for a request, None if keys may not call it."""
+    resource = path.strip("/").split("/", 1)[0]
+    scope = f"{resource}:{'read' if method in READ_METHODS else 'write'}"
+    return scope if scope in SCOPES else None
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class ApiKeyService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    @writes
+    def create_key(
+        self,
+        user_id: UUID,
+        name: str,
+        scopes: Sequence[str],
+        expires_in_days: Optional[int] = None
+    ) -> Tuple[ApiKey, str]:
+        """Store a new key for ``user_id``; the plaintext key is only returned here."""
+        prefix, key = generate_api_key()
+        api_key = ApiKey(
+            user_id=user_id,
+            name=name,
+            prefix=prefix,
+            key_hash=hash_api_key(key),
+            scopes=sorted(set(scopes)),
+            expires_at=datetime.utcnow() + timedelta(days=expires_in_days) if expires_in_days else None,
+            usage_count=0
+        )
+        self.db.add(api_key)
+        self.db.commit()
+        self.db.refresh(api_key)
+        return api_key, key
+
+    @read_only
+    def list_keys(self, user_id: UUID) -> List[ApiKey]:
+        return (
+            self.db.query(ApiKey)
+            .filter(ApiKey.user_id == user_id)
+            .order_by(ApiKey.created_at, ApiKey.id)
+            .all()
+        )
+
+    @writes
+    def revoke_key(self, user_id: UUID, key_id: UUID) -> bool:
+        api_key = self.db.query(ApiKey).filter(ApiKey.id == key_id, ApiKey.user_id == user_id).first()
+        if api_key is None:
+            return False
+        if api_key.revoked_at is None:
+            api_key.revoked_at = datetime.utcnow()
+            self.db.commit()
+        return True
+
+    # Reads the primary on purpose: a revocation must never lag behind
+    def validate(self, key: str, digest: str) -> Optional[ValidatedKey]:
+        """The key behind ``key`` if it exists, matches and is still usable."""
+        prefix = parse_prefix(key)
+        if prefix is None:
+            return None
+        api_key = self.db.query(ApiKey).filter(ApiKey.prefix == prefix).first()
+        if api_key is None or not hmac.compare_digest(api_key.key_hash, digest):
+            return None
+        expires_at = _timestamp(api_key.expires_at)
+        if api_key.revoked_at is not None or (expires_at is not None and expires_at <= time.time()):
+            return None
+        user = self.db.get(User, api_key.user_id)
+        if user is None:
+            return None
+        # Cached across requests; must not be expired by this session's commits
+        self.db.expunge(user)
+        return ValidatedKey(api_key.id, user, frozenset(api_key.scopes), expires_at)
+
+    @writes
+    def record_usage(self, counts: Dict[UUID, Tuple[int, datetime]], chunk_size: int = 500) -> int:
+        """Add ``(uses, last_used_at)`` to each key, one UPDATE per chunk."""
+        items = list(counts.items())
+        updated = 0
+        for start in range(0, len(items), chunk_size):
+            chunk = dict(items[start:start + chunk_size])
+            result = self.db.execute(
+                update(ApiKey)
+                .where(ApiKey.id.in_(chunk))
+                .values(
+                    usage_count=func.coalesce(ApiKey.usage_count, 0) + case(
+                        {key: uses for key, (uses, _) in chunk.items()}, value=ApiKey.id
+                    ),
+                    last_used_at=case(
+                        {key: used_at for key, (_, used_at) in chunk.items()}, value=ApiKey.id
+                    )
+                )
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        self.db.commit()
+        return updated
+
+
+api_key_usage = AccessAccumulator(
+    SessionLocal,
+    interval=settings.ACCESS_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.ACCESS_FLUSH_MAX_PENDING,
+    write=lambda db, counts: ApiKeyService(db).record_usage(counts),
+    name="api_key_usage"
+)
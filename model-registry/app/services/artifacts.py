@@ -0,0 +1,532 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from starlette.responses import RedirectResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.telemetry import ARTIFACT_TRANSFER_BYTES, ARTIFACT_TRANSFER_DURATION
+from app.services.model_service import ModelService
+
+
+class ChecksumMismatchError(Exception):
+    def __init__(self, expected: str, actual: str):
+        super().__init__(f"SHA-256 of the upload is {actual}, expected {expected}")
+        self.expected = expected
+        self.actual = actual
+
+
+class StoredArtifact(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+
+class ArtifactInfo(NamedTuple):
+    size: int
+    etag: Optional[str]
+
+
+class RangeNotSatisfiableError(Exception):
+    pass
+
+
+def byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive ``(start, end)`` requested by a ``Range`` header, or None
+    for the whole file.
+
+    Only single ranges are served; malformed or multi-range headers are
+    ignored as RFC 9110 allows. Raises :class:`RangeNotSatisfiableError`
+    when the range lies outside the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiableError(header)
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError(header)
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, hashed straight from a read-only memory map."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                digest.update(mapped)
+    return digest.hexdigest()
+
+
+def _record_download(model_id: UUID, size: int, seconds: float) -> None:
+    # The request's session may already be closed once the body is sent
+    with SessionLocal() as db:
+        ModelService(db).record_download(model_id, size, seconds)
+
+
+async def _downloaded(backend: str, model_id: UUID, sent: int, seconds: float) -> None:
+    ARTIFACT_TRANSFER_BYTES.labels(backend, "download").inc(sent)
+    ARTIFACT_TRANSFER_DURATION.labels(backend, "download").observe(seconds)
+    await run_in_threadpool(_record_download, model_id, sent, seconds)
+
+
+class ArtifactStorage:
+    """Where uploaded model artifacts live.
+
+    ``upload`` verifies the SHA-256 of the stream and leaves nothing
+    behind when it does not match; entries then reference the artifact
+    by the returned ``path``, which ``key_from_path`` maps back to a key.
+    Subclasses implement one backend, chosen by ``ARTIFACT_STORAGE``.
+    """
+
+    name = "base"
+
+    def key_from_path(self, path: Optional[str]) -> Optional[str]:
+        """Key of an ``artifact_path`` stored here; None if it lives elsewhere."""
+        raise NotImplementedError
+
+    async def upload(
+        self,
+        model_id: UUID,
+        chunks: AsyncIterator[bytes],
+        expected_sha256: Optional[str] = None
+    ) -> StoredArtifact:
+        """Store the artifact of ``model_id`` read from ``chunks``.
+
+        Raises :class:`ChecksumMismatchError` when the content does not
+        hash to ``expected_sha256``.
+        """
+        raise NotImplementedError
+
+    def info(self, key: str) -> Optional[ArtifactInfo]:
+        raise NotImplementedError
+
+    def redirect(self, key: str) -> Optional[Response]:
+        """Response that has the client fetch the bytes elsewhere, or None
+        if they can only be served by the API."""
+        return None
+
+    def send(
+        self,
+        model_id: UUID,
+        key: str,
+        start: int,
+        end: int,
+        status_code: int,
+        headers: Mapping[str, str]
+    ) -> Response:
+        """Response with bytes ``start`` to ``end`` (inclusive) of the artifact;
+        records the download once its body is sent."""
+        raise NotImplementedError
+
+
+class S3ArtifactStorage(ArtifactStorage):
+    """Model artifacts in an S3 bucket (or MinIO).
+
+    Uploads are streamed into a multipart upload: the body is cut into
+    ``part_size`` parts and up to ``concurrency`` of them are sent at
+    once, so at most ``(concurrency + 1) * part_size`` bytes of an upload
+    are held in memory however large the file. The SHA-256 is computed
+    over the stream and the upload is only completed when it matches;
+    otherwise it is aborted and no object ever appears in the bucket.
+
+    ``client`` is a boto3 S3 client, or anything with the same methods.
+    """
+
+    name = "s3"
+
+    def __init__(self, client: Any, bucket: str, part_size: int, concurrency: int):
+        self.client = client
+        self.bucket = bucket
+        self.part_size = part_size
+        self.concurrency = concurrency
+
+    def key_for(self, model_id: UUID) -> str:
+        return f"artifacts/{model_id}"
+
+    def path_for(self, key: str) -> str:
+        return f"s3://{self.bucket}/{key}"
+
+    def key_from_path(self, path: Optional[str]) -> Optional[str]:
+        prefix = f"s3://{self.bucket}/"
+        if not path or not path.startswith(prefix) or len(path) == len(prefix):
+            return None
+        return path[len(prefix):]
+
+    def info(self, key: str) -> Optional[ArtifactInfo]:
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return ArtifactInfo(head["ContentLength"], head.get("ETag"))
+
+    def presigned_url(self, key: str, expires_in: int) -> str:
+        """Short-lived URL fetching the object straight from S3, Range requests included."""
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=expires_in
+        )
+
+    def redirect(self, key: str) -> Optional[Response]:
+        return RedirectResponse(
+            self.presigned_url(key, settings.ARTIFACT_PRESIGNED_URL_TTL_SECONDS), status_code=307
+        )
+
+    def read(self, key: str, start: int, end: int, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """Bytes ``start`` to ``end`` (inclusive) of the object, in chunks."""
+        response = self.client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end}")
+        body = response["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    async def _stream(self, model_id: UUID, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        started = time.perf_counter()
+        sent = 0
+        async for chunk in iterate_in_threadpool(self.read(key, start, end)):
+            sent += len(chunk)
+            yield chunk
+        await _downloaded(self.name, model_id, sent, time.perf_counter() - started)
+
+    def send(
+        self,
+        model_id: UUID,
+        key: str,
+        start: int,
+        end: int,
+        status_code: int,
+        headers: Mapping[str, str]
+    ) -> Response:
+        return StreamingResponse(
+            self._stream(model_id, key, start, end),
+            status_code=status_code,
+            media_type="application/octet-stream",
+            headers=headers
+        )
+
+    async def upload(
+        self,
+        model_id: UUID,
+        chunks: AsyncIterator[bytes],
+        expected_sha256: Optional[str] = None
+    ) -> StoredArtifact:
+        key = self.key_for(model_id)
+        started = time.perf_counter()
+        digest = hashlib.sha256()
+        buffer = bytearray()
+        size = 0
+        upload_id: Optional[str] = None
+        parts: List[asyncio.Task] = []
+        failures: List[BaseException] = []
+        slots = asyncio.Semaphore(self.concurrency)
+
+        def part_done(task: asyncio.Task) -> None:
+            # Cancelled parts are our own cleanup, not the cause
+            if not task.cancelled() and task.exception() is not None:
+                failures.append(task.exception())
+
+        async def send_part(number: int, body: bytes) -> Dict[str, Any]:
+            try:
+                response = await run_in_threadpool(
+                    self.client.upload_part,
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body
+                )
+                return {"PartNumber": number, "ETag": response["ETag"]}
+            finally:
+                slots.release()
+
+        async def start_part(body: bytes) -> None:
+            nonlocal upload_id
+            if upload_id is None:
+                created = await run_in_threadpool(self.client.create_multipart_upload, Bucket=self.bucket, Key=key)
+                upload_id = created["UploadId"]
+            # Waiting for a slot stops reading the body: backpressure on the client
+            await slots.acquire()
+            task = asyncio.ensure_future(send_part(len(parts) + 1, body))
+            task.add_done_callback(part_done)
+            parts.append(task)
+
+        try:
+            async for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                buffer += chunk
+                while len(buffer) >= self.part_size:
+                    part = bytes(buffer[:self.part_size])
+                    del buffer[:self.part_size]
+                    await start_part(part)
+                # Surface a failed part now rather than after the whole body
+                if failures:
+                    raise failures[0]
+
+            actual = digest.hexdigest()
+            if expected_sha256 is not None and actual != expected_sha256.lower():
+                raise ChecksumMismatchError(expected_sha256.lower(), actual)
+
+            if upload_id is None:
+                await run_in_threadpool(self.client.put_object, Bucket=self.bucket, Key=key, Body=bytes(buffer))
+            else:
+                if buffer:
+                    await start_part(bytes(buffer))
+                completed = await asyncio.gather(*parts)
+                await run_in_threadpool(
+                    self.client.complete_multipart_upload,
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": completed}
+                )
+        except BaseException:
+            for task in parts:
+                task.cancel()
+            await asyncio.gather(*parts, return_exceptions=True)
+            if upload_id is not None:
+                await run_in_threadpool(
+                    self.client.abort_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id
+                )
+            raise
+
+        ARTIFACT_TRANSFER_BYTES.labels(self.name, "upload").inc(size)
+        ARTIFACT_TRANSFER_DURATION.labels(self.name, "upload").observe(time.perf_counter() - started)
+        return StoredArtifact(self.path_for(key), size, actual)
+
+
+class FileRangeResponse(Response):
+    """Bytes ``start`` to ``end`` (inclusive) of a file.
+
+    Read in chunks with ``pread`` on the threadpool. uvicorn, which runs
+    the API, offers no zero-copy path; a server with the ASGI
+    ``http.response.zerocopysend`` extension is handed the file instead.
+    For large local artifacts prefer ``X-Accel-Redirect`` (see
+    :class:`LocalArtifactStorage`). ``on_sent(bytes, seconds)`` is awaited
+    once the body has been sent.
+    """
+
+    chunk_size = 1024 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        end: int,
+        status_code: int,
+        headers: Mapping[str, str],
+        on_sent: Callable[[int, float], Awaitable[None]]
+    ):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.status_code = status_code
+        self.media_type = "application/octet-stream"
+        self.background = None
+        self.on_sent = on_sent
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        count = self.end - self.start + 1
+        started = time.perf_counter()
+        with open(self.path, "rb") as f:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f,
+                    "offset": self.start,
+                    "count": count,
+                    "more_body": False,
+                })
+                sent = count
+            else:
+                sent = 0
+                while sent < count:
+                    chunk = await run_in_threadpool(
+                        os.pread, f.fileno(), min(self.chunk_size, count - sent), self.start + sent
+                    )
+                    if not chunk:
+                        break
+                    sent += len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": sent < count})
+                if sent < count:
+                    # Truncated underneath us; end the body rather than hang
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+        await self.on_sent(sent, time.perf_counter() - started)
+
+
+def _fsync_directory(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class LocalArtifactStorage(ArtifactStorage):
+    """Model artifacts on a local filesystem, for installs without object storage.
+
+    Files are content-addressed under ``root`` (``sha256/ab/cd/<digest>``),
+    so identical artifacts are stored once and a path never changes
+    content. Uploads go to a temporary file that is fsynced, hashed
+    through a memory map of what actually reached the disk and then
+    renamed into place, so readers never see a partial artifact.
+
+    Downloads are handed to the front proxy with ``X-Accel-Redirect``
+    when ``accel_redirect_prefix`` is set (nginx serves that location with
+    sendfile), the recommended setup; otherwise, and in proxy mode, the
+    API streams them with :class:`FileRangeResponse`.
+    """
+
+    name = "local"
+    scheme = "local://"
+    write_buffer = 1024 * 1024
+    _KEY = re.compile(r"sha256/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}")
+
+    def __init__(self, root: str, accel_redirect_prefix: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.accel_redirect_prefix = accel_redirect_prefix
+
+    def key_from_path(self, path: Optional[str]) -> Optional[str]:
+        if not path or not path.startswith(self.scheme):
+            return None
+        key = path[len(self.scheme):]
+        # Only keys this backend generates: never a path outside the root
+        return key if self._KEY.fullmatch(key) else None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def info(self, key: str) -> Optional[ArtifactInfo]:
+        try:
+            size = os.stat(self._path(key)).st_size
+        except FileNotFoundError:
+            return None
+        # Content-addressed: the digest is a strong validator
+        return ArtifactInfo(size, f'"{os.path.basename(key)}"')
+
+    def redirect(self, key: str) -> Optional[Response]:
+        if not self.accel_redirect_prefix:
+            return None
+        return Response(
+            headers={"X-Accel-Redirect": f"{self.accel_redirect_prefix.rstrip('/')}/{key}"},
+            media_type="application/octet-stream"
+        )
+
+    def send(
+        self,
+        model_id: UUID,
+        key: str,
+        start: int,
+        end: int,
+        status_code: int,
+        headers: Mapping[str, str]
+    ) -> Response:
+        return FileRangeResponse(
+            self._path(key), start, end, status_code, headers,
+            on_sent=lambda sent, seconds: _downloaded(self.name, model_id, sent, seconds)
+        )
+
+    def _store(self, temporary: str, digest: str) -> str:
+        key = f"sha256/{digest[:2]}/{digest[2:4]}/{digest}"
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path) and file_sha256(path) == digest:
+            # Same content already stored
+            os.unlink(temporary)
+        else:
+            os.replace(temporary, path)
+            _fsync_directory(directory)
+        return key
+
+    async def upload(
+        self,
+        model_id: UUID,
+        chunks: AsyncIterator[bytes],
+        expected_sha256: Optional[str] = None
+    ) -> StoredArtifact:
+        started = time.perf_counter()
+        directory = os.path.join(self.root, "tmp")
+        await run_in_threadpool(os.makedirs, directory, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix=f"{model_id}-")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                buffer = bytearray()
+                async for chunk in chunks:
+                    buffer += chunk
+                    if len(buffer) >= self.write_buffer:
+                        await run_in_threadpool(f.write, buffer)
+                        size += len(buffer)
+                        buffer.clear()
+                size += len(buffer)
+
+                def finish() -> None:
+                    f.write(buffer)
+                    f.flush()
+                    os.fsync(f.fileno())
+                await run_in_threadpool(finish)
+
+            actual = await run_in_threadpool(file_sha256, temporary)
+            if expected_sha256 is not None and actual != expected_sha256.lower():
+                raise ChecksumMismatchError(expected_sha256.lower(), actual)
+            key = await run_in_threadpool(self._store, temporary, actual)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+            raise
+
+        ARTIFACT_TRANSFER_BYTES.labels(self.name, "upload").inc(size)
+        ARTIFACT_TRANSFER_DURATION.labels(self.name, "upload").observe(time.perf_counter() - started)
+        return StoredArtifact(self.scheme + key, size, actual)
+
+
+def s3_client() -> Any:
+    return boto3.client(
+        "s3",
+        endpoint_url=settings.S3_ENDPOINT_URL,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID or None,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None,
+        region_name=settings.AWS_REGION,
+        # One connection per concurrent part of every upload in flight
+        config=Config(max_pool_connections=max(10, settings.S3_MULTIPART_CONCURRENCY * 4))
+    )
+
+
+@lru_cache
+def get_artifact_storage() -> ArtifactStorage:
+    """The process-wide artifact storage picked by ``ARTIFACT_STORAGE``; a FastAPI dependency."""
+    if settings.ARTIFACT_STORAGE == "local":
+        return LocalArtifactStorage(settings.ARTIFACT_LOCAL_ROOT, settings.ARTIFACT_LOCAL_ACCEL_REDIRECT_PREFIX)
+    if settings.ARTIFACT_STORAGE == "s3":
+        return S3ArtifactStorage(
+            s3_client(),
+            settings.S3_BUCKET,
+            part_size=settings.S3_MULTIPART_PART_SIZE_MB * 1024 * 1024,
+            concurrency=settings.S3_MULTIPART_CONCURRENCY
+        )
+    raise ValueError(f"Unknown ARTIFACT_STORAGE {settings.ARTIFACT_STORAGE!r}, expected s3 or local")
@@ -0,0 +1,112 @@
+from typing import Any, AsyncIterator, Hashable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import DBSession, owned_session, run_db
+from app.core.routing import replica_reads
+from app.models.model import ModelRegistryEntry, ModelStatus, ModelType
+from app.schemas.model import ModelCreate, ModelUpdate
+from app.services.model_cache import model_cache
+from app.services.model_service import ModelService
+
+
+class AsyncModelService:
+    """Awaitable front for :class:`ModelService` used by the API routers.
+
+    With an ``AsyncSession`` (``DATABASE_ASYNC=true``) every call runs on the
+    async driver and never occupies a threadpool worker; with a sync
+    ``Session`` the call is handed to the threadpool as before.
+    """
+
+    def __init__(self, db: DBSession):
+        self.db = db
+
+    async def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        return await run_db(
+            self.db, lambda session: getattr(ModelService(session), method)(*args, **kwargs)
+        )
+
+    async def _cached(self, key: Hashable, method: str, *args: Any) -> Any:
+        async def load():
+            # Other requests may wait on this load after ours is gone and
+            # its session closed, so it runs on a session of its own
+            async with owned_session(self.db) as session:
+                entry = await run_db(session, lambda db: getattr(ModelService(db), method)(*args))
+                if entry is not None:
+                    # Shared between requests: detached, nothing can expire it
+                    session.expunge(entry)
+                return entry
+        return await model_cache.get_or_load(key, load)
+
+    async def register_model(self, model: ModelCreate, created_by: str) -> ModelRegistryEntry:
+        return await self._call("register_model", model, created_by)
+
+    async def register_models(self, models: List[ModelCreate], created_by: str, **options: Any) -> List[Any]:
+        return await self._call("register_models", models, created_by, **options)
+
+    async def get_model_by_id(
+        self,
+        model_id: UUID,
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[ModelRegistryEntry]:
+        return await self._cached(
+            ("id", model_id, tuple(fields) if fields else None),
+            "get_model_by_id", model_id, fields
+        )
+
+    async def get_latest_model(
+        self,
+        model_type: Optional[ModelType] = None,
+        domain: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[ModelRegistryEntry]:
+        return await self._cached(
+            ("latest", model_type, domain, tuple(fields) if fields else None),
+            "get_latest_model", model_type, domain, fields
+        )
+
+    async def promote_model(self, model_id: UUID, target_status: ModelStatus, reviewer: str) -> bool:
+        return await self._call("promote_model", model_id, target_status, reviewer)
+
+    async def list_models(self, **filters: Any) -> Tuple[List[ModelRegistryEntry], Optional[int], Optional[str]]:
+        return await self._call("list_models", **filters)
+
+    async def tag_counts(self, limit: int = 100) -> List[Tuple[str, int]]:
+        return await self._call("tag_counts", limit)
+
+    async def search_models(self, **params: Any) -> Tuple[List[ModelRegistryEntry], Optional[int], Optional[str]]:
+        return await self._call("search_models", **params)
+
+    async def update_model(self, model_id: UUID, model_update: ModelUpdate) -> Optional[ModelRegistryEntry]:
+        return await self._call("update_model", model_id, model_update)
+
+    async def set_artifact(self, model_id: UUID, artifact_path: str, checksum: str) -> Optional[ModelRegistryEntry]:
+        return await self._call("set_artifact", model_id, artifact_path, checksum)
+
+    async def delete_model(self, model_id: UUID) -> bool:
+        return await self._call("delete_model", model_id)
+
+    async def record_access(self, model_id: UUID) -> bool:
+        return await self._call("record_access", model_id)
+
+    async def record_download(self, model_id: UUID, size: Optional[int] = None, seconds: Optional[float] = None) -> bool:
+        return await self._call("record_download", model_id, size, seconds)
+
+    async def export_models(self, **filters: Any) -> AsyncIterator[List[ModelRegistryEntry]]:
+        """Yield batches of :meth:`ModelService.export_models` as they are fetched."""
+        if isinstance(self.db, AsyncSession):
+            with replica_reads(self.db.sync_session):
+                result = await self.db.stream_scalars(ModelService.export_query(**filters))
+            async for batch in result.partitions():
+                yield batch
+            return
+
+        result = await self._call("export_models", **filters)
+        batches = result.partitions()
+        try:
+            while (batch := await run_in_threadpool(next, batches, None)) is not None:
+                yield batch
+        finally:
+            await run_in_threadpool(result.close)
@@ -0,0 +1,46 @@
+import csv
+import enum
+import io
+from datetime import datetime
+from typing import AsyncIterator, List
+
+from app.core.serialization import dumps, entry_dict
+from app.models.model import ModelRegistryEntry
+from app.schemas.model import MODEL_FIELDS
+
+
+async def ndjson_lines(batches: AsyncIterator[List[ModelRegistryEntry]]) -> AsyncIterator[bytes]:
+    """One ``ModelResponse`` JSON document per line, one chunk per batch."""
+    async for batch in batches:
+        yield b"".join(dumps(entry_dict(entry)) + b"\n" for entry in batch)
+
+
+async def csv_lines(batches: AsyncIterator[List[ModelRegistryEntry]]) -> AsyncIterator[str]:
+    """CSV with a header row; JSON columns are embedded as JSON text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(MODEL_FIELDS)
+    yield _drain(buffer)
+    async for batch in batches:
+        for entry in batch:
+            writer.writerow(_csv_value(value) for value in entry_dict(entry).values())
+        yield _drain(buffer)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _drain(buffer: io.StringIO) -> str:
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.telemetry import CACHE_COALESCED_LOADS
+
+
+class ModelCache:
+    """Read-through cache for single-entry lookups (``/models/{id}``, ``/models/latest``).
+
+    Concurrent misses for one key share a single load (single-flight), so
+    a deploy that starts hundreds of pods at once costs one query per key.
+    ``ModelService`` calls :meth:`invalidate` after committing a change;
+    a load that overlapped an invalidation is returned but not stored.
+    Other processes see changes once their copy expires, after at most
+    ``ttl`` seconds. Cached entries must be detached from their session.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024, enabled: bool = True):
+        self.enabled = enabled
+        self._cache = TTLCache(ttl, maxsize, name="model")
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached value for ``key``, else the result of ``load()``; ``None`` is not cached."""
+        if not self.enabled:
+            return await load()
+        value = self._cache.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, load))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            CACHE_COALESCED_LOADS.labels("model").inc()
+        # A cancelled caller must not cancel the load the others wait on
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generation
+        value = await load()
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._cache.set(key, value)
+        return value
+
+    def invalidate(self, model_id: Optional[UUID] = None) -> None:
+        """Forget ``model_id`` and every "latest" lookup; safe from any thread."""
+        with self._lock:
+            self._generation += 1
+            self._cache.delete_where(lambda key, _: key[0] == "latest" or key[1] == model_id)
+
+    def invalidate_many(self, model_ids: Iterable[UUID]) -> None:
+        """:meth:`invalidate` for a batch of ids in a single pass."""
+        model_ids = set(model_ids)
+        with self._lock:
+            self._generation += 1
+            self._cache.delete_where(lambda key, _: key[0] == "latest" or key[1] in model_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "inflight": len(self._inflight), **self._cache.stats()}
+
+
+model_cache = ModelCache(
+    ttl=settings.MODEL_CACHE_TTL_SECONDS,
+    maxsize=settings.MODEL_CACHE_MAX_ENTRIES,
+    enabled=settings.MODEL_CACHE_ENABLED
+)
@@ -1,39 +1,207 @@
-from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, desc, func
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from sqlalchemy.orm import Session, defer, load_only
+from sqlalchemy import bindparam, case, desc, func, insert, literal, select, update
+from sqlalchemy.engine import ScalarResult
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import Select
 from uuid import UUID
 from datetime import datetime
 
-from app.models.model import ModelRegistryEntry, ModelStatus, ModelType
-from app.schemas.model import ModelCreate, ModelUpdate
+from app.core.instrumentation import timed_methods
+from app.core.routing import read_only, writes
+from app.models.model import (
+    HEAVY_COLUMNS, ModelRegistryEntry, ModelStatus, ModelTag, ModelType, ServerTimestamp, parse_tags
+)
+from app.schemas.model import MODEL_FIELDS, VERSION_FIELDS, CountStrategy, ModelCreate, ModelUpdate, TagMatch
+from app.services.model_cache import model_cache
+from app.services.pagination import count_rows, paginate
+from app.services.search import get_search_backend
 
 
+class BatchRejectedError(Exception):
+    """An atomic batch was rolled back; ``errors`` maps item positions to database errors."""
+
+    def __init__(self, errors: Dict[int, str]):
+        super().__init__(f"{len(errors)} item(s) rejected by the database")
+        self.errors = errors
+
+
+@timed_methods("model_service")
 class ModelService:
     def __init__(self, db: Session):
         self.db = db
+        self.search = get_search_backend(db)
 
+    @writes
     def register_model(self, model: ModelCreate, created_by: str) -> ModelRegistryEntry:
         db_model = ModelRegistryEntry(
-            **model.dict(),
+            **model.model_dump(),
             created_by=created_by
         )
         self.db.add(db_model)
+        self.db.flush()
+        self.search.index([db_model.model_id])
         self.db.commit()
         self.db.refresh(db_model)
         return db_model
 
-    def get_model_by_id(self, model_id: UUID) -> Optional[ModelRegistryEntry]:
-        return self.db.query(ModelRegistryEntry).filter(
+    @writes
+    def register_models(
+        self,
+        models: List[ModelCreate],
+        created_by: str,
+        atomic: bool = True,
+        chunk_size: int = 500
+    ) -> List[Union[ModelRegistryEntry, str]]:
+        """Insert many models with multi-row INSERT ... RETURNING statements.
+
+        Returns, in input order, the created entry or the database error
+        for each model. With ``atomic`` any failure rolls back the whole
+        batch and raises :class:`BatchRejectedError` naming the offending
+        models; otherwise a failing chunk is retried row by row inside
+        savepoints so only the offending rows are rejected.
+        """
+        results: List[Union[ModelRegistryEntry, str]] = []
+        failed_at: Optional[int] = None
+        try:
+            for failed_at in range(0, len(models), chunk_size):
+                chunk = models[failed_at:failed_at + chunk_size]
+                if atomic:
+                    results.extend(self._insert_chunk(chunk, created_by))
+                else:
+                    results.extend(self._insert_chunk_isolated(chunk, created_by))
+            failed_at = None
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            if not atomic:
+                raise
+            raise BatchRejectedError(self._rejected_rows(models, failed_at, chunk_size, created_by, e)) from e
+        except Exception:
+            self.db.rollback()
+            raise
+        return results
+
+    def _rejected_rows(
+        self,
+        models: List[ModelCreate],
+        failed_at: Optional[int],
+        chunk_size: int,
+        created_by: str,
+        error: SQLAlchemyError
+    ) -> Dict[int, str]:
+        """Find the rows of the chunk at ``failed_at`` that the database rejects.
+
+        The chunks before it are inserted again as they were, the failing
+        one row by row inside savepoints, and everything is then discarded.
+        """
+        if failed_at is None:
+            # The commit failed, no single chunk to replay
+            failed_at, chunk, errors = 0, models, {}
+        else:
+            chunk = models[failed_at:failed_at + chunk_size]
+            try:
+                # Held open and only ever rolled back: with pysqlite the
+                # first SAVEPOINT opens the transaction and releasing it
+                # would commit the replayed rows
+                self.db.begin_nested()
+                for start in range(0, failed_at, chunk_size):
+                    self._insert_chunk(models[start:start + chunk_size], created_by)
+                outcomes = self._insert_rows_isolated(chunk, created_by)
+            except SQLAlchemyError:
+                outcomes = []
+            finally:
+                self.db.rollback()
+            errors = {
+                failed_at + offset: outcome
+                for offset, outcome in enumerate(outcomes) if isinstance(outcome, str)
+            }
+        # Nothing fails on its own (e.g. a transient error): blame the whole chunk
+        return errors or dict.fromkeys(
+            range(failed_at, failed_at + len(chunk)), str(getattr(error, "orig", None) or error)
+        )
+
+    def _insert_chunk(self, chunk: List[ModelCreate], created_by: str) -> List[ModelRegistryEntry]:
+        entries = self.db.scalars(
+            insert(ModelRegistryEntry).returning(ModelRegistryEntry, sort_by_parameter_order=True),
+            [dict(model.model_dump(), created_by=created_by) for model in chunk]
+        ).all()
+        # Bulk INSERT bypasses the attribute events that maintain model_tags
+        tag_rows = [
+            {"model_id": entry.model_id, "tag": tag}
+            for entry in entries for tag in parse_tags(entry.tags)
+        ]
+        if tag_rows:
+            self.db.execute(insert(ModelTag), tag_rows)
+        self.search.index([entry.model_id for entry in entries])
+        return entries
+
+    def _insert_chunk_isolated(
+        self,
+        chunk: List[ModelCreate],
+        created_by: str
+    ) -> List[Union[ModelRegistryEntry, str]]:
+        try:
+            with self.db.begin_nested():
+                return self._insert_chunk(chunk, created_by)
+        except SQLAlchemyError:
+            return self._insert_rows_isolated(chunk, created_by)
+
+    def _insert_rows_isolated(
+        self,
+        rows: List[ModelCreate],
+        created_by: str
+    ) -> List[Union[ModelRegistryEntry, str]]:
+        """Insert ``rows`` one by one, each inside its own savepoint."""
+        results: List[Union[ModelRegistryEntry, str]] = []
+        for model in rows:
+            try:
+                with self.db.begin_nested():
+                    results.extend(self._insert_chunk([model], created_by))
+            except SQLAlchemyError as e:
+                results.append(str(getattr(e, "orig", None) or e))
+        return results
+
+    @staticmethod
+    def _load_options(fields: Optional[Sequence[str]] = None):
+        """Loader options for the columns a caller is going to read.
+
+        Without ``fields`` every column except ``HEAVY_COLUMNS`` is loaded.
+        ``VERSION_FIELDS`` (key, pagination and ETag columns) always are.
+        """
+        if fields is None:
+            return [defer(getattr(ModelRegistryEntry, name)) for name in HEAVY_COLUMNS]
+        columns = {*VERSION_FIELDS, *fields}
+        return [load_only(*(
+            getattr(ModelRegistryEntry, name)
+            for name in columns
+            if name in ModelRegistryEntry.__table__.c
+        ))]
+
+    @read_only
+    def get_model_by_id(
+        self,
+        model_id: UUID,
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[ModelRegistryEntry]:
+        return self.db.query(ModelRegistryEntry).options(*self._load_options(fields)).filter(
             ModelRegistryEntry.model_id == model_id
         ).first()
 
+    @read_only
     def get_latest_model(
         self,
         model_type: Optional[ModelType] = None,
-        domain: Optional[str] = None
+        domain: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
     ) -> Optional[ModelRegistryEntry]:
-        query = self.db.query(ModelRegistryEntry).filter(
-            ModelRegistryEntry.status == ModelStatus.PRODUCTION
+        # Inline the status so the planner can match the partial
+        # production indexes; a bound parameter cannot be
+        production = bindparam(
+            "production", ModelStatus.PRODUCTION, type_=ModelRegistryEntry.status.type, literal_execute=True
+        )
+        query = self.db.query(ModelRegistryEntry).options(*self._load_options(fields)).filter(
+            ModelRegistryEntry.status == production
         )
 
         if model_type:
@@ -43,6 +211,7 @@ class ModelService:
 
         return query.order_by(desc(ModelRegistryEntry.created_at)).first()
 
+    @writes
     def promote_model(
         self,
         model_id: UUID,
@@ -57,96 +226,278 @@ class ModelService:
         model.reviewer = reviewer
         model.last_updated_at = datetime.utcnow()
         self.db.commit()
+        model_cache.invalidate(model_id)
         return True
 
+    @read_only
     def list_models(
         self,
         model_type: Optional[ModelType] = None,
         domain: Optional[str] = None,
         status: Optional[ModelStatus] = None,
-        tags: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        tag_match: TagMatch = TagMatch.ALL,
         page: int = 1,
-        size: int = 20
-    ) -> Tuple[List[ModelRegistryEntry], int]:
-        query = self.db.query(ModelRegistryEntry)
+        size: int = 20,
+        cursor: Optional[str] = None,
+        count: CountStrategy = CountStrategy.EXACT,
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[ModelRegistryEntry], Optional[int], Optional[str]]:
+        query = self.db.query(ModelRegistryEntry).options(*self._load_options(fields)).filter(
+            *self._list_filters(model_type, domain, status, tags, tag_match)
+        )
+
+        total = count_rows(query, count)
+        models, next_cursor = paginate(query, page, size, cursor)
+
+        return models, total, next_cursor
 
+    @classmethod
+    def _list_filters(
+        cls,
+        model_type: Optional[ModelType],
+        domain: Optional[str],
+        status: Optional[ModelStatus],
+        tags: Optional[List[str]],
+        tag_match: TagMatch
+    ) -> list:
+        filters = []
         if model_type:
-            query = query.filter(ModelRegistryEntry.model_type == model_type)
+            filters.append(ModelRegistryEntry.model_type == model_type)
         if domain:
-            query = query.filter(ModelRegistryEntry.domain == domain)
+            filters.append(ModelRegistryEntry.domain == domain)
         if status:
-            query = query.filter(ModelRegistryEntry.status == status)
+            filters.append(ModelRegistryEntry.status == status)
+        # Normalized like stored tags; blank ones leave nothing to match
+        tags = parse_tags(",".join(tags or []))
         if tags:
-            query = query.filter(ModelRegistryEntry.tags.contains(tags))
+            filters.append(cls._tag_filter(tags, tag_match))
+        return filters
+
+    @staticmethod
+    def export_query(
+        model_type: Optional[ModelType] = None,
+        domain: Optional[str] = None,
+        status: Optional[ModelStatus] = None,
+        tags: Optional[List[str]] = None,
+        tag_match: TagMatch = TagMatch.ALL,
+        since: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Select:
+        """Statement for a full export with the ``list_models`` filters.
 
-        total = query.count()
-        models = query.order_by(desc(ModelRegistryEntry.created_at)).offset(
-            (page - 1) * size
-        ).limit(size).all()
+        ``since`` keeps entries created or updated at or after the watermark
+        (to the second on SQLite, where ``created_at`` has no fractions).
+        Rows come back oldest change first and are fetched ``batch_size`` at
+        a time from a server-side cursor.
+        """
+        changed_at = func.coalesce(ModelRegistryEntry.last_updated_at, ModelRegistryEntry.created_at)
+        statement = select(ModelRegistryEntry).where(
+            *ModelService._list_filters(model_type, domain, status, tags, tag_match)
+        )
+        if since:
+            # Bound like created_at: on SQLite a watermark rendered with
+            # microseconds sorts after entries created in that very second
+            statement = statement.where(changed_at >= literal(since, ServerTimestamp))
+        return statement.order_by(changed_at, ModelRegistryEntry.model_id).execution_options(
+            yield_per=batch_size
+        )
 
-        return models, total
+    @read_only
+    def export_models(self, **filters) -> ScalarResult:
+        """Stream of :meth:`export_query` rows; iterate with ``partitions()``."""
+        return self.db.scalars(self.export_query(**filters))
 
+    @staticmethod
+    def _tag_filter(tags: List[str], tag_match: TagMatch):
+        """``tags`` must already be normalized and unique, see :func:`parse_tags`."""
+        tagged = select(ModelTag.model_id).where(ModelTag.tag.in_(tags))
+        if tag_match == TagMatch.ALL:
+            tagged = tagged.group_by(ModelTag.model_id).having(
+                func.count(ModelTag.tag) == len(tags)
+            )
+        return ModelRegistryEntry.model_id.in_(tagged)
+
+    @read_only
+    def tag_counts(self, limit: int = 100) -> List[Tuple[str, int]]:
+        """Tags ordered by how many entries carry them."""
+        count = func.count(ModelTag.model_id)
+        return self.db.query(ModelTag.tag, count).group_by(ModelTag.tag).order_by(
+            desc(count), ModelTag.tag
+        ).limit(limit).all()
+
+    @read_only
     def search_models(
         self,
         query: str,
         domain: Optional[str] = None,
         model_type: Optional[ModelType] = None,
         page: int = 1,
-        size: int = 20
-    ) -> Tuple[List[ModelRegistryEntry], int]:
-        db_query = self.db.query(ModelRegistryEntry).filter(
-            or_(
-                ModelRegistryEntry.model_name.contains(query),
-                ModelRegistryEntry.display_name.contains(query),
-                ModelRegistryEntry.tags.contains(query)
-            )
-        )
+        size: int = 20,
+        cursor: Optional[str] = None,
+        count: CountStrategy = CountStrategy.EXACT,
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[ModelRegistryEntry], Optional[int], Optional[str]]:
+        """Relevance-ranked full-text search.
+
+        Returned entries carry their ``score`` and matched ``highlights``.
+        """
+        matches = self.search.matches(query)
+        if matches is None:
+            return [], None if count == CountStrategy.NONE else 0, None
+
+        db_query = self.db.query(ModelRegistryEntry, matches.c.rank).options(
+            *self._load_options(fields)
+        ).join(matches, matches.c.model_id == ModelRegistryEntry.model_id)
 
         if domain:
             db_query = db_query.filter(ModelRegistryEntry.domain == domain)
         if model_type:
             db_query = db_query.filter(ModelRegistryEntry.model_type == model_type)
 
-        total = db_query.count()
-        models = db_query.order_by(desc(ModelRegistryEntry.created_at)).offset(
-            (page - 1) * size
-        ).limit(size).all()
+        total = count_rows(db_query, count)
+        rows, next_cursor = paginate(
+            db_query, page, size, cursor, sort_column=matches.c.rank
+        )
+
+        highlights = self.search.highlight(query, [entry.model_id for entry, _ in rows])
+        models = []
+        for entry, rank in rows:
+            entry.score = rank
+            entry.highlights = highlights.get(entry.model_id, {})
+            models.append(entry)
 
-        return models, total
+        return models, total, next_cursor
 
+    @writes
     def update_model(
         self,
         model_id: UUID,
         model_update: ModelUpdate
     ) -> Optional[ModelRegistryEntry]:
-        model = self.get_model_by_id(model_id)
+        model = self.get_model_by_id(model_id, MODEL_FIELDS)
         if not model:
             return None
 
-        update_data = model_update.dict(exclude_unset=True)
+        update_data = model_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(model, field, value)
 
+        model.last_updated_at = datetime.utcnow()
+        self.db.flush()
+        self.search.index([model_id])
+        self.db.commit()
+        model_cache.invalidate(model_id)
+        self.db.refresh(model)
+        return model
+
+    @writes
+    def set_artifact(self, model_id: UUID, artifact_path: str, checksum: str) -> Optional[ModelRegistryEntry]:
+        """Point the entry at an uploaded, verified artifact."""
+        model = self.get_model_by_id(model_id, MODEL_FIELDS)
+        if not model:
+            return None
+
+        model.artifact_path = artifact_path
+        model.checksum = checksum
         model.last_updated_at = datetime.utcnow()
         self.db.commit()
+        model_cache.invalidate(model_id)
         self.db.refresh(model)
         return model
 
+    @writes
     def delete_model(self, model_id: UUID) -> bool:
         model = self.get_model_by_id(model_id)
         if not model:
             return False
 
+        self.search.remove([model_id])
         self.db.delete(model)
         self.db.commit()
+        model_cache.invalidate(model_id)
         return True
 
+    @writes
     def record_access(self, model_id: UUID) -> bool:
-        model = self.get_model_by_id(model_id)
-        if not model:
+        return self.increment_access_counts({model_id: (1, datetime.utcnow())}) > 0
+
+    @writes
+    def record_download(self, model_id: UUID, size: Optional[int] = None, seconds: Optional[float] = None) -> bool:
+        """Count an artifact download as an access and add it to ``usage_stats["downloads"]``.
+
+        ``size`` and ``seconds`` are only known for downloads streamed
+        through the API, not for presigned redirects.
+        """
+        usage_stats = self.db.execute(
+            select(ModelRegistryEntry.usage_stats)
+            .where(ModelRegistryEntry.model_id == model_id)
+            .with_for_update()
+        ).first()
+        if usage_stats is None:
             return False
 
-        model.access_count += 1
-        model.last_accessed = datetime.utcnow()
+        now = datetime.utcnow()
+        usage = dict(usage_stats[0]) if isinstance(usage_stats[0], dict) else {}
+        downloads = dict(usage.get("downloads") or {})
+        downloads["count"] = downloads.get("count", 0) + 1
+        downloads["last_downloaded_at"] = now.isoformat()
+        if size is not None:
+            downloads["proxied"] = downloads.get("proxied", 0) + 1
+            downloads["proxied_bytes"] = downloads.get("proxied_bytes", 0) + size
+            downloads["proxied_seconds"] = round(downloads.get("proxied_seconds", 0.0) + seconds, 3)
+        usage["downloads"] = downloads
+
+        self.db.execute(
+            update(ModelRegistryEntry)
+            .where(ModelRegistryEntry.model_id == model_id)
+            .values(
+                usage_stats=usage,
+                access_count=func.coalesce(ModelRegistryEntry.access_count, 0) + 1,
+                last_accessed=now,
+                last_updated_at=ModelRegistryEntry.last_updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        model_cache.invalidate(model_id)
+        return True
+
+    @writes
+    def increment_access_counts(
+        self,
+        counts: Dict[UUID, Tuple[int, datetime]],
+        chunk_size: int = 500
+    ) -> int:
+        """Atomically add ``(increment, last_accessed)`` to each model's counters.
+
+        Each chunk of models is updated by a single set-based UPDATE that
+        picks the per-model values with CASE, so the increment happens in
+        the database and concurrent writers never lose updates. Returns the
+        number of rows updated.
+        """
+        items = list(counts.items())
+        updated = 0
+        for start in range(0, len(items), chunk_size):
+            chunk = dict(items[start:start + chunk_size])
+            model_id = ModelRegistryEntry.model_id
+            result = self.db.execute(
+                update(ModelRegistryEntry)
+                .where(model_id.in_(chunk))
+                .values(
+                    access_count=func.coalesce(ModelRegistryEntry.access_count, 0) + case(
+                        {key: increment for key, (increment, _) in chunk.items()}, value=model_id
+                    ),
+                    last_accessed=case(
+                        {key: accessed_at for key, (_, accessed_at) in chunk.items()}, value=model_id
+                    ),
+                    # Access bookkeeping is not a change to the model itself
+                    last_updated_at=ModelRegistryEntry.last_updated_at
+                )
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
         self.db.commit()
-        return True
\ No newline at end of file
+        # Cached entries carry access_count/last_accessed, which /metrics serves
+        model_cache.invalidate_many(counts)
+        return updated
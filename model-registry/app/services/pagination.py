@@ -0,0 +1,128 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple, Union
+from uuid import UUID
+
+from sqlalchemy import desc, tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import ColumnElement
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.model import ModelRegistryEntry
+from app.schemas.model import CountStrategy
+
+
+# Exact counts per filter set, reused by the "estimated" strategy when the
+# database has no planner statistics to offer (e.g. SQLite)
+_count_cache = TTLCache(ttl=settings.COUNT_CACHE_TTL_SECONDS, name="count")
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(sort_key: Union[datetime, float], model_id: UUID) -> str:
+    """Build an opaque cursor pointing just after the row with these keys."""
+    if isinstance(sort_key, datetime):
+        sort_key = sort_key.isoformat()
+    payload = json.dumps([sort_key, str(model_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Union[datetime, float], UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, model_id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(sort_key, str):
+            sort_key = datetime.fromisoformat(sort_key)
+        elif not isinstance(sort_key, (int, float)):
+            raise TypeError(sort_key)
+        return sort_key, UUID(model_id)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid pagination cursor")
+
+
+def _cursor_keys(row) -> Tuple[Union[datetime, float], UUID]:
+    if isinstance(row, ModelRegistryEntry):
+        return row.created_at, row.model_id
+    entry, sort_key = row
+    return sort_key, entry.model_id
+
+
+def count_cache_stats() -> Dict[str, Any]:
+    return _count_cache.stats()
+
+
+def paginate(
+    query: Query,
+    page: int,
+    size: int,
+    cursor: Optional[str] = None,
+    sort_column: Optional[ColumnElement] = None
+) -> Tuple[list, Optional[str]]:
+    """Fetch one page of ``query`` in descending ``sort_column`` order.
+
+    ``sort_column`` defaults to ``created_at`` (newest first). Any other
+    column must be selected as the second entity of ``query``, as search
+    does with its relevance rank. With a cursor the page is located by a
+    keyset predicate on ``(sort_column, model_id)``, so the cost is the same
+    at any depth; otherwise the classic ``page``/``size`` offset is used.
+    One extra row is fetched to decide whether a ``next_cursor`` should be
+    returned.
+    """
+    if sort_column is None:
+        sort_column = ModelRegistryEntry.created_at
+    if cursor:
+        sort_key, model_id = decode_cursor(cursor)
+        if isinstance(sort_key, datetime) != (sort_column is ModelRegistryEntry.created_at):
+            raise InvalidCursorError("Cursor does not belong to this listing")
+        query = query.filter(
+            tuple_(sort_column, ModelRegistryEntry.model_id)
+            < (sort_key, model_id)
+        )
+    query = query.order_by(
+        desc(sort_column),
+        desc(ModelRegistryEntry.model_id)
+    )
+    if not cursor:
+        query = query.offset((page - 1) * size)
+
+    rows = query.limit(size + 1).all()
+    if len(rows) > size:
+        rows = rows[:size]
+        return rows, encode_cursor(*_cursor_keys(rows[-1]))
+    return rows, None
+
+
+def count_rows(query: Query, strategy: CountStrategy) -> Optional[int]:
+    """Count the rows matched by ``query`` using the requested strategy.
+
+    ``estimated`` reads the PostgreSQL planner's row estimate for the
+    filtered query; on other databases it serves an exact count cached per
+    filter set for ``COUNT_CACHE_TTL_SECONDS``. ``none`` skips counting.
+    """
+    if strategy == CountStrategy.NONE:
+        return None
+    if strategy == CountStrategy.EXACT:
+        return query.count()
+
+    dialect = query.session.get_bind().dialect
+    statement = query.statement.compile(
+        dialect=dialect, compile_kwargs={"literal_binds": True}
+    )
+    if dialect.name == "postgresql":
+        # Straight to the driver: as text() a ":word" inside a quoted
+        # search term would be parsed as a bind parameter
+        plan = query.session.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}"
+        ).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    key = str(statement)
+    total = _count_cache.get(key)
+    if total is None:
+        total = query.count()
+        _count_cache.set(key, total)
+    return total
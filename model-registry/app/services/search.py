@@ -0,0 +1,268 @@
+import difflib
+import re
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import DDL, Float, bindparam, column, event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Subquery
+
+from app.core.database import Base
+from app.models.model import ModelRegistryEntry
+
+_TOKEN_RE = re.compile(r"[0-9a-z_]+")
+
+HIGHLIGHT_FIELDS = ("model_name", "display_name", "tags")
+
+
+def tokenize(query: str) -> List[str]:
+    return _TOKEN_RE.findall(query.lower())
+
+
+def _model_id_column():
+    return column("model_id", ModelRegistryEntry.model_id.type)
+
+
+def _ids_param():
+    return bindparam("ids", expanding=True, type_=ModelRegistryEntry.model_id.type)
+
+
+class SearchBackend:
+    """Maintains the weighted search document for each registry entry.
+
+    Documents are built from ``model_name`` and ``display_name`` (highest
+    weight), ``tags``, ``domain``/``framework`` and ``dataset_name``
+    (lowest weight). Subclasses implement the index for one database.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def index(self, model_ids: List[UUID]) -> None:
+        """(Re)build the documents for ``model_ids`` from their stored rows."""
+        raise NotImplementedError
+
+    def remove(self, model_ids: List[UUID]) -> None:
+        raise NotImplementedError
+
+    def rebuild(self) -> None:
+        """Backfill the documents of every entry in the registry."""
+        raise NotImplementedError
+
+    def matches(self, query: str) -> Optional[Subquery]:
+        """Subquery of ``(model_id, rank)`` for the entries matching ``query``.
+
+        Every token is matched as a prefix; tokens that match nothing fall
+        back to fuzzy matching. Higher ``rank`` means more relevant.
+        Returns ``None`` when the query has no searchable tokens.
+        """
+        raise NotImplementedError
+
+    def highlight(self, query: str, model_ids: List[UUID]) -> Dict[UUID, Dict[str, str]]:
+        """Matched fragments of ``model_ids`` wrapped in ``<mark>`` tags."""
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(SearchBackend):
+    """``tsvector`` documents with a GIN index, plus ``pg_trgm`` for typos."""
+
+    _UPSERT = """
+        INSERT INTO model_search_documents (model_id, search_vector, terms)
+        SELECT model_id,
+               setweight(to_tsvector('simple', coalesce(model_name, '') || ' ' || coalesce(display_name, '')), 'A')
+               || setweight(to_tsvector('simple', coalesce(tags, '')), 'B')
+               || setweight(to_tsvector('simple', coalesce(domain, '') || ' ' || coalesce(framework, '')), 'C')
+               || setweight(to_tsvector('simple', coalesce(dataset_name, '')), 'D'),
+               lower(concat_ws(' ', model_name, display_name, tags, domain, framework, dataset_name))
+        FROM model_registry
+        {where}
+        ON CONFLICT (model_id) DO UPDATE
+        SET search_vector = EXCLUDED.search_vector, terms = EXCLUDED.terms
+    """
+
+    def index(self, model_ids: List[UUID]) -> None:
+        statement = text(self._UPSERT.format(where="WHERE model_id IN :ids"))
+        self.db.execute(statement.bindparams(_ids_param()), {"ids": model_ids})
+
+    def remove(self, model_ids: List[UUID]) -> None:
+        statement = text("DELETE FROM model_search_documents WHERE model_id IN :ids")
+        self.db.execute(statement.bindparams(_ids_param()), {"ids": model_ids})
+
+    def rebuild(self) -> None:
+        self.db.execute(text(self._UPSERT.format(where="")))
+
+    @staticmethod
+    def _tsquery(tokens: List[str]) -> str:
+        return " & ".join(f"{token}:*" for token in tokens)
+
+    def matches(self, query: str) -> Optional[Subquery]:
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        return text("""
+            SELECT model_id,
+                   CAST(ts_rank_cd(search_vector, to_tsquery('simple', :tsquery))
+                        + word_similarity(:raw, terms) AS DOUBLE PRECISION) AS rank
+            FROM model_search_documents
+            WHERE search_vector @@ to_tsquery('simple', :tsquery)
+               OR terms %> :raw
+        """).bindparams(
+            tsquery=self._tsquery(tokens), raw=" ".join(tokens)
+        ).columns(_model_id_column(), column("rank", Float)).subquery("matches")
+
+    def highlight(self, query: str, model_ids: List[UUID]) -> Dict[UUID, Dict[str, str]]:
+        tokens = tokenize(query)
+        if not tokens or not model_ids:
+            return {}
+        headlines = ", ".join(
+            f"ts_headline('simple', coalesce({field}, ''), to_tsquery('simple', :tsquery), "
+            f"'StartSel=<mark>, StopSel=</mark>, HighlightAll=true')"
+            for field in HIGHLIGHT_FIELDS
+        )
+        statement = text(
+            f"SELECT model_id, {headlines} FROM model_registry WHERE model_id IN :ids"
+        ).bindparams(_ids_param()).columns(_model_id_column())
+        rows = self.db.execute(
+            statement, {"tsquery": self._tsquery(tokens), "ids": model_ids}
+        )
+        return {row[0]: _marked(row[1:]) for row in rows}
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """In-process fallback on an FTS5 table, used by the test suite.
+
+    Fuzzy matching expands unknown tokens to close terms from the FTS5
+    vocabulary with :mod:`difflib`. Only terms sharing the token's first
+    letter and within ``FUZZY_LENGTH_SLACK`` characters of its length are
+    compared, so a typo in the first letter is not corrected.
+    """
+
+    FUZZY_LENGTH_SLACK = 2
+
+    # bm25 weights for (model_id, name, display_name, tags, domain, framework, dataset)
+    _WEIGHTS = "0, 10.0, 10.0, 4.0, 2.0, 2.0, 1.0"
+
+    def index(self, model_ids: List[UUID]) -> None:
+        self.remove(model_ids)
+        statement = text("""
+            INSERT INTO model_search_fts (model_id, model_name, display_name, tags, domain, framework, dataset)
+            SELECT model_id, model_name, display_name, tags, domain, framework, dataset_name
+            FROM model_registry WHERE model_id IN :ids
+        """)
+        self.db.execute(statement.bindparams(_ids_param()), {"ids": model_ids})
+
+    def remove(self, model_ids: List[UUID]) -> None:
+        statement = text("DELETE FROM model_search_fts WHERE model_id IN :ids")
+        self.db.execute(statement.bindparams(_ids_param()), {"ids": model_ids})
+
+    def rebuild(self) -> None:
+        self.db.execute(text("DELETE FROM model_search_fts"))
+        self.db.execute(text("""
+            INSERT INTO model_search_fts (model_id, model_name, display_name, tags, domain, framework, dataset)
+            SELECT model_id, model_name, display_name, tags, domain, framework, dataset_name
+            FROM model_registry
+        """))
+
+    def _fuzzy_candidates(self, token: str) -> List[str]:
+        # A term range fts5vocab answers without walking the whole vocabulary
+        return self.db.execute(
+            text("""
+                SELECT term FROM model_search_vocab
+                WHERE term >= :first AND term < :first || '~'
+                  AND length(term) BETWEEN :shortest AND :longest
+            """),
+            {
+                "first": token[0],
+                "shortest": len(token) - self.FUZZY_LENGTH_SLACK,
+                "longest": len(token) + self.FUZZY_LENGTH_SLACK,
+            }
+        ).scalars().all()
+
+    def _match_expression(self, tokens: List[str]) -> str:
+        clauses = []
+        for token in tokens:
+            has_prefix = self.db.execute(
+                text("SELECT 1 FROM model_search_vocab WHERE term >= :t AND term < :t || '~' LIMIT 1"),
+                {"t": token}
+            ).first()
+            if has_prefix:
+                clauses.append(f'"{token}"*')
+                continue
+            candidates = difflib.get_close_matches(token, self._fuzzy_candidates(token), n=3, cutoff=0.75)
+            clauses.append("(" + " OR ".join(f'"{term}"' for term in candidates or [token]) + ")")
+        return " AND ".join(clauses)
+
+    def matches(self, query: str) -> Optional[Subquery]:
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        return text(f"""
+            SELECT model_id, -bm25(model_search_fts, {self._WEIGHTS}) AS rank
+            FROM model_search_fts
+            WHERE model_search_fts MATCH :match
+        """).bindparams(match=self._match_expression(tokens)).columns(
+            _model_id_column(), column("rank", Float)
+        ).subquery("matches")
+
+    def highlight(self, query: str, model_ids: List[UUID]) -> Dict[UUID, Dict[str, str]]:
+        tokens = tokenize(query)
+        if not tokens or not model_ids:
+            return {}
+        # FTS5 column positions of HIGHLIGHT_FIELDS
+        highlights = ", ".join(
+            f"highlight(model_search_fts, {column}, '<mark>', '</mark>')" for column in (1, 2, 3)
+        )
+        statement = text(f"""
+            SELECT model_id, {highlights} FROM model_search_fts
+            WHERE model_search_fts MATCH :match AND model_id IN :ids
+        """).bindparams(_ids_param()).columns(_model_id_column())
+        rows = self.db.execute(
+            statement, {"match": self._match_expression(tokens), "ids": model_ids}
+        )
+        return {row[0]: _marked(row[1:]) for row in rows}
+
+
+def _marked(values) -> Dict[str, str]:
+    return {
+        field: value
+        for field, value in zip(HIGHLIGHT_FIELDS, values)
+        if value and "<mark>" in value
+    }
+
+
+def get_search_backend(db: Session) -> SearchBackend:
+    if db.get_bind().dialect.name == "postgresql":
+        return PostgresSearchBackend(db)
+    return SQLiteSearchBackend(db)
+
+
+# The search index lives outside the ORM mappings; keep it in step with
+# create_all()/drop_all(). Production PostgreSQL schemas come from Alembic,
+# which also owns CREATE EXTENSION pg_trgm: that needs rights the app should
+# not run with, so scratch databases built with create_all() enable it first.
+for _statement in (
+    """CREATE TABLE IF NOT EXISTS model_search_documents (
+        model_id UUID PRIMARY KEY REFERENCES model_registry (model_id) ON DELETE CASCADE,
+        search_vector TSVECTOR NOT NULL,
+        terms TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_model_search_documents_vector "
+    "ON model_search_documents USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_model_search_documents_terms "
+    "ON model_search_documents USING GIN (terms gin_trgm_ops)",
+):
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(
+    Base.metadata, "before_drop",
+    DDL("DROP TABLE IF EXISTS model_search_documents").execute_if(dialect="postgresql")
+)
+
+for _statement in (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS model_search_fts USING fts5(
+        model_id UNINDEXED, model_name, display_name, tags, domain, framework, dataset
+    )""",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS model_search_vocab USING fts5vocab(model_search_fts, 'row')",
+):
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in ("DROP TABLE IF EXISTS model_search_vocab", "DROP TABLE IF EXISTS model_search_fts"):
+    event.listen(Base.metadata, "before_drop", DDL(_statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Artifact upload and download throughput per storage backend.
+
+Starts the API once per backend (ARTIFACT_STORAGE=local/s3), uploads the
+same random artifact to ``--uploads`` models with ``--concurrency``
+streams, then downloads it through the API: whole files concurrently,
+and one file as ``--parts`` parallel Range requests. Prints MB/s for
+each phase. Downloads use proxy mode so both backends are measured
+through the API; ``s3`` needs MinIO (``docker-compose up minio`` and
+``scripts/init_minio.py``).
+
+    python -m benchmarks.artifact_storage --size-mb 256 --backends local s3
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.harness import reset_sqlite, serve
+
+CHUNK = 1024 * 1024
+
+
+def make_artifact(path, size_mb):
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            chunk = os.urandom(CHUNK)
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+async def file_chunks(path):
+    with open(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, CHUNK):
+            yield chunk
+
+
+async def login(client):
+    credentials = {"username": "bench@example.com", "password": "benchpass123"}
+    await client.post("/auth/register", json={"email": credentials["username"], "password": credentials["password"]})
+    token = (await client.post("/auth/token", data=credentials)).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+
+
+async def register(client, checksum, count):
+    ids = []
+    for i in range(count):
+        response = await client.post("/models/register", json={
+            "model_name": f"artifact-bench-{i}",
+            "display_name": f"Artifact Bench {i}",
+            "version": "1.0.0",
+            "model_type": "Transformer",
+            "domain": "nlp",
+            "artifact_path": "pending",
+            "model_format": "safetensors",
+            "checksum": checksum,
+        })
+        response.raise_for_status()
+        ids.append(response.json()["model_id"])
+    return ids
+
+
+async def timed(jobs, concurrency):
+    """Run ``jobs`` (coroutine factories returning byte counts) ``concurrency`` at a time."""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(job):
+        async with slots:
+            return await job()
+
+    started = time.perf_counter()
+    sizes = await asyncio.gather(*(run(job) for job in jobs))
+    elapsed = time.perf_counter() - started
+    total = sum(sizes)
+    return {"bytes": total, "seconds": round(elapsed, 3), "mb_per_s": round(total / CHUNK / elapsed, 1)}
+
+
+async def drive(base_url, path, checksum, size, args):
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        await login(client)
+        ids = await register(client, checksum, args.uploads)
+
+        async def upload(model_id):
+            response = await client.post(f"/models/{model_id}/artifact", content=file_chunks(path))
+            response.raise_for_status()
+            return size
+
+        async def download(model_id, byte_range=None):
+            headers = {"Range": f"bytes={byte_range[0]}-{byte_range[1]}"} if byte_range else {}
+            received = 0
+            async with client.stream("GET", f"/models/{model_id}/artifact?mode=proxy", headers=headers) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_raw():
+                    received += len(chunk)
+            return received
+
+        step = -(-size // args.parts)
+        ranges = [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+        return {
+            "upload": await timed([lambda model_id=model_id: upload(model_id) for model_id in ids], args.concurrency),
+            "download": await timed(
+                [lambda model_id=model_id: download(model_id) for model_id in ids], args.concurrency
+            ),
+            "download_ranges": await timed(
+                [lambda byte_range=byte_range: download(ids[0], byte_range) for byte_range in ranges], args.parts
+            ),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=["local", "s3"], default=["local"])
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--size-mb", type=int, default=128, help="Artifact size")
+    parser.add_argument("--uploads", type=int, default=4, help="Models to upload the artifact to")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent uploads and whole-file downloads")
+    parser.add_argument("--parts", type=int, default=8, help="Parallel Range requests for one download")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--output", help="Write the results as JSON here")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "artifact.bin")
+        checksum = make_artifact(path, args.size_mb)
+        size = os.path.getsize(path)
+        for backend in args.backends:
+            reset_sqlite(args.database_url)
+            env = {
+                "DATABASE_URL": args.database_url,
+                "ARTIFACT_STORAGE": backend,
+                "ARTIFACT_LOCAL_ROOT": os.path.join(scratch, "store"),
+            }
+            with serve(args.port, **env) as base_url:
+                results[backend] = asyncio.run(drive(base_url, path, checksum, size, args))
+            print(f"{backend:>5}: {json.dumps(results[backend])}", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"size_mb": args.size_mb, "results": results}, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
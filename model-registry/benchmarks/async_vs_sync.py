@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Load benchmark comparing the sync (threadpool) and async database paths.
+
+Starts the API under uvicorn once per mode (DATABASE_ASYNC=false/true),
+seeds a few models and drives read endpoints with a fixed number of
+concurrent clients, then prints requests/sec and latency percentiles.
+
+    python -m benchmarks.async_vs_sync --concurrency 64 --duration 15
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.harness import reset_sqlite, serve, summarize
+
+
+async def seed(client, models):
+    credentials = {"username": "bench@example.com", "password": "benchpass123"}
+    await client.post("/auth/register", json={"email": credentials["username"], "password": credentials["password"]})
+    token = (await client.post("/auth/token", data=credentials)).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    ids = []
+    for i in range(models):
+        response = await client.post("/models/register", json={
+            "model_name": f"bench-model-{i}",
+            "display_name": f"Bench Model {i}",
+            "version": "1.0.0",
+            "model_type": "Transformer",
+            "domain": "nlp",
+            "tags": "bench,nlp",
+            "artifact_path": f"s3://quarlets-models/bench/{i}",
+            "model_format": "onnx",
+            "checksum": "0" * 64,
+        })
+        response.raise_for_status()
+        ids.append(response.json()["model_id"])
+    return ids
+
+
+async def drive(base_url, concurrency, duration, models):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        ids = await seed(client, models)
+        paths = [f"/models/{model_id}" for model_id in ids] + ["/models/?size=20", "/models/search?q=bench"]
+        latencies, errors = [], 0
+        stop_at = time.monotonic() + duration
+
+        async def worker(offset):
+            nonlocal errors
+            i = offset
+            while time.monotonic() < stop_at:
+                path = paths[i % len(paths)]
+                i += 1
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    return summarize(latencies, errors, elapsed)
+
+
+def run_mode(database_url, async_mode, args):
+    with serve(args.port, DATABASE_URL=database_url, DATABASE_ASYNC=str(async_mode).lower()) as base_url:
+        return asyncio.run(drive(base_url, args.concurrency, args.duration, args.models))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench.db",
+                        help="sync SQLAlchemy URL; SQLite files are recreated per mode")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--models", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    results = {}
+    for mode, async_mode in (("sync", False), ("async", True)):
+        reset_sqlite(args.database_url)
+        results[mode] = run_mode(args.database_url, async_mode, args)
+        print(f"{mode:>5}: {json.dumps(results[mode])}")
+
+    print(f"async/sync throughput: {results['async']['rps'] / results['sync']['rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
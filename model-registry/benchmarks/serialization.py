@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of list page serialization.
+
+Compares the standard FastAPI path (``ModelListResponse`` built from ORM
+objects, validated against the ``response_model``, ``jsonable_encoder``d
+and dumped with ``json``) against the orjson fast path in
+``app.core.serialization``, on in-memory entries with sizeable JSON columns.
+Prints serialized MB/s and pages/s for each.
+
+    python -m benchmarks.serialization --size 100 --payload-keys 200
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.core.serialization import FastJSONResponse, page_dict  # noqa: E402
+from app.models.model import ModelRegistryEntry, ModelStatus, ModelType  # noqa: E402
+from app.schemas.model import MODEL_FIELDS, CountStrategy, ModelListResponse  # noqa: E402
+
+
+def make_entries(count, payload_keys):
+    created = datetime(2024, 1, 1)
+    payload = {f"feature_{i}": {"type": "float", "min": 0.0, "max": float(i)} for i in range(payload_keys)}
+    return [
+        ModelRegistryEntry(
+            model_id=uuid.uuid4(),
+            model_name=f"bench-model-{i}",
+            display_name=f"Bench Model {i}",
+            version="1.0.0",
+            model_type=ModelType.TRANSFORMER,
+            domain="nlp",
+            tags="bench,nlp",
+            artifact_path=f"s3://quarlets-models/bench/{i}",
+            model_format="onnx",
+            input_schema=payload,
+            output_schema={"label": "string", "score": "float"},
+            dependencies={"torch": "2.1.0", "transformers": "4.35.0"},
+            dataset_name="bench",
+            training_parameters={"epochs": 3, "lr": 0.001, "layers": list(range(24))},
+            metrics={"accuracy": 0.9, "per_class": [0.1 * k for k in range(50)]},
+            status=ModelStatus.DEVELOPMENT,
+            created_by="bench@example.com",
+            created_at=created + timedelta(seconds=i),
+            last_updated_at=created + timedelta(seconds=i, minutes=5),
+            checksum="0" * 64,
+            encryption_status=False,
+            resource_requirements={"cpu": 2, "memory": "4Gi"},
+            access_count=i,
+            usage_stats={"daily": list(range(30))},
+        )
+        for i in range(count)
+    ]
+
+
+async def standard_path(entries, field):
+    response = ModelListResponse(models=entries, total=len(entries), page=1, size=len(entries))
+    content = await serialize_response(field=field, response_content=response, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def fast_path(entries, field):
+    return FastJSONResponse(
+        page_dict(entries, MODEL_FIELDS, len(entries), 1, len(entries), CountStrategy.EXACT, None)
+    ).body
+
+
+async def measure(render, entries, field, duration):
+    pages = total_bytes = 0
+    started = time.perf_counter()
+    while (elapsed := time.perf_counter() - started) < duration:
+        total_bytes += len(await render(entries, field))
+        pages += 1
+    return pages / elapsed, total_bytes / elapsed / 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100, help="Entries per page")
+    parser.add_argument("--payload-keys", type=int, default=200, help="Keys in each input_schema document")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per path")
+    args = parser.parse_args()
+
+    entries = make_entries(args.size, args.payload_keys)
+    field = create_response_field("Response_list_models", ModelListResponse)
+
+    print(f"page of {args.size} entries, {len(await fast_path(entries, field)) / 1e3:.0f} kB serialized")
+    print(f"{'path':<10} {'pages/s':>10} {'MB/s':>10}")
+    results = {}
+    for name, render in (("standard", standard_path), ("fast", fast_path)):
+        results[name] = await measure(render, entries, field, args.duration)
+        print(f"{name:<10} {results[name][0]:>10.1f} {results[name][1]:>10.1f}")
+    print(f"speedup: {results['fast'][1] / results['standard'][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the full-text search documents for every registered model
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.search import get_search_backend
+
+
+def backfill_search_index():
+    db = SessionLocal()
+    try:
+        get_search_backend(db).rebuild()
+        db.commit()
+        print("Search index rebuilt")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_search_index()
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+# Point the application at the SQLite test database before it is imported
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+os.environ.setdefault("DATABASE_URL", SQLALCHEMY_DATABASE_URL)
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.core.database import get_db, Base
+from app.core.principals import api_key_cache, principal_cache
+from app.services.model_cache import model_cache
+
+# Test database
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+
+@pytest.fixture
+def client():
+    model_cache.clear()
+    principal_cache.clear()
+    api_key_cache.clear()
+    Base.metadata.create_all(bind=engine)
+    with TestClient(app) as c:
+        yield c
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db_session(client):
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def auth_headers(client):
+    client.post(
+        "/auth/register",
+        json={"email": "owner@example.com", "password": "ownerpass123"}
+    )
+    response = client.post(
+        "/auth/token",
+        data={"username": "owner@example.com", "password": "ownerpass123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def register_model(client, auth_headers):
+    def _register(**overrides):
+        payload = {
+            "model_name": "sentiment-classifier",
+            "display_name": "Sentiment Classifier",
+            "version": "1.0.0",
+            "model_type": "Transformer",
+            "domain": "nlp",
+            "tags": "nlp,sentiment",
+            "artifact_path": "s3://quarlets-models/sentiment/1.0.0",
+            "model_format": "onnx",
+            "checksum": "0" * 64,
+        }
+        payload.update(overrides)
+        response = client.post("/models/register", json=payload, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+    return _register
@@ -0,0 +1,327 @@
+import asyncio
+import hashlib
+import os
+import threading
+import uuid
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.main import app
+from app.services.artifacts import (
+    FileRangeResponse,
+    LocalArtifactStorage,
+    S3ArtifactStorage,
+    file_sha256,
+    get_artifact_storage
+)
+
+
+class FakeBody:
+    def __init__(self, data):
+        self.data = data
+
+    def iter_chunks(self, chunk_size):
+        for start in range(0, len(self.data), chunk_size):
+            yield self.data[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeS3:
+    """In-memory stand-in for the boto3 S3 client methods artifact storage uses."""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.aborted = []
+        self.part_sizes = []
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = bytes(Body)
+        return {}
+
+    def create_multipart_upload(self, Bucket, Key):
+        with self._lock:
+            upload_id = f"upload-{len(self.uploads)}"
+            self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        with self._lock:
+            self.uploads[UploadId][PartNumber] = bytes(Body)
+            self.part_sizes.append(len(Body))
+        return {"ETag": f'"{hashlib.md5(Body).hexdigest()}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        assert numbers == sorted(parts)
+        self.objects[(Bucket, Key)] = b"".join(parts[number] for number in numbers)
+        return {}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+        self.aborted.append(UploadId)
+        return {}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        data = self.objects[(Bucket, Key)]
+        return {"ContentLength": len(data), "ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+
+    def get_object(self, Bucket, Key, Range):
+        start, end = (int(value) for value in Range[len("bytes="):].split("-"))
+        return {"Body": FakeBody(self.objects[(Bucket, Key)][start:end + 1])}
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://s3.example.com/{Params['Bucket']}/{Params['Key']}?X-Amz-Expires={ExpiresIn}"
+
+
+@pytest.fixture
+def s3():
+    fake = FakeS3()
+    storage = S3ArtifactStorage(fake, "test-bucket", part_size=64 * 1024, concurrency=2)
+    app.dependency_overrides[get_artifact_storage] = lambda: storage
+    yield fake
+    del app.dependency_overrides[get_artifact_storage]
+
+
+def _chunks(data, size=10000):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_artifact_upload_streams_multipart_and_verifies_checksum(client, auth_headers, register_model, s3):
+    data = bytes(range(256)) * 1500  # ~375 KiB, six parts
+    model = register_model(checksum=hashlib.sha256(data).hexdigest())
+
+    response = client.post(f"/models/{model['model_id']}/artifact", content=_chunks(data), headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["artifact_path"] == f"s3://test-bucket/artifacts/{model['model_id']}"
+    assert s3.objects[("test-bucket", f"artifacts/{model['model_id']}")] == data
+    assert len(s3.part_sizes) == 6 and max(s3.part_sizes) == 64 * 1024
+    assert client.get(f"/models/{model['model_id']}", headers=auth_headers).json()["artifact_path"].startswith("s3://")
+
+
+def test_artifact_upload_rejects_checksum_mismatch(client, auth_headers, register_model, s3):
+    model = register_model(checksum="a" * 64)
+
+    response = client.post(f"/models/{model['model_id']}/artifact", content=_chunks(b"x" * 200000), headers=auth_headers)
+    assert response.status_code == 422
+    assert response.json()["detail"]["actual"] == hashlib.sha256(b"x" * 200000).hexdigest()
+    assert s3.objects == {} and len(s3.aborted) == 1
+    entry = client.get(f"/models/{model['model_id']}", headers=auth_headers).json()
+    assert entry["artifact_path"] == model["artifact_path"]
+
+    # Small artifacts skip multipart and are only written once verified
+    response = client.post(f"/models/{model['model_id']}/artifact", content=b"small", headers=auth_headers)
+    assert response.status_code == 422
+    assert s3.objects == {}
+
+
+class FailingPartS3(FakeS3):
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == 2:
+            raise ClientError({"Error": {"Code": "SlowDown"}}, "UploadPart")
+        return super().upload_part(Bucket, Key, UploadId, PartNumber, Body)
+
+
+def test_artifact_upload_aborts_on_the_failed_part():
+    fake = FailingPartS3()
+    storage = S3ArtifactStorage(fake, "test-bucket", part_size=64 * 1024, concurrency=2)
+
+    async def body():
+        for chunk in _chunks(b"x" * (20 * 64 * 1024), 64 * 1024):
+            yield chunk
+            await asyncio.sleep(0)
+
+    with pytest.raises(ClientError, match="SlowDown"):
+        asyncio.run(storage.upload(uuid.uuid4(), body()))
+    assert fake.objects == {} and fake.uploads == {} and len(fake.aborted) == 1
+
+
+def test_artifact_upload_unknown_model(client, auth_headers, s3):
+    response = client.post(
+        "/models/00000000-0000-0000-0000-000000000000/artifact", content=b"data", headers=auth_headers
+    )
+    assert response.status_code == 404
+
+
+@pytest.fixture
+def uploaded(client, auth_headers, register_model, s3):
+    data = bytes(range(256)) * 1000
+    model = register_model(checksum=hashlib.sha256(data).hexdigest())
+    response = client.post(f"/models/{model['model_id']}/artifact", content=data, headers=auth_headers)
+    assert response.status_code == 200
+    return model["model_id"], data
+
+
+def test_artifact_download_redirects_to_presigned_url(client, auth_headers, uploaded):
+    model_id, _ = uploaded
+    response = client.get(f"/models/{model_id}/artifact", headers=auth_headers, follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"] == (
+        f"https://s3.example.com/test-bucket/artifacts/{model_id}?X-Amz-Expires=300"
+    )
+
+    metrics = client.get(f"/metrics/{model_id}", headers=auth_headers).json()
+    assert metrics["access_count"] == 1
+    assert metrics["usage_stats"]["downloads"]["count"] == 1
+
+
+def test_artifact_download_changes_usage_stats_etag(client, auth_headers, uploaded):
+    model_id, _ = uploaded
+    url = f"/models/{model_id}?fields=usage_stats"
+    etag = client.get(url, headers=auth_headers).headers["etag"]
+
+    client.get(f"/models/{model_id}/artifact", headers=auth_headers, follow_redirects=False)
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["usage_stats"]["downloads"]["count"] == 1
+
+
+def test_artifact_download_proxy_serves_ranges(client, auth_headers, uploaded):
+    model_id, data = uploaded
+    url = f"/models/{model_id}/artifact?mode=proxy"
+
+    response = client.get(url, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.content == data
+    assert response.headers["accept-ranges"] == "bytes"
+    etag = response.headers["etag"]
+
+    response = client.get(url, headers={**auth_headers, "Range": "bytes=1000-1999"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 1000-1999/{len(data)}"
+    assert response.content == data[1000:2000]
+
+    # Resume from an offset, and the last bytes only
+    assert client.get(url, headers={**auth_headers, "Range": "bytes=250000-"}).content == data[250000:]
+    assert client.get(url, headers={**auth_headers, "Range": "bytes=-10"}).content == data[-10:]
+
+    # A stale If-Range gets the whole artifact
+    response = client.get(url, headers={**auth_headers, "Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200 and len(response.content) == len(data)
+    response = client.get(url, headers={**auth_headers, "Range": "bytes=0-9", "If-Range": etag})
+    assert response.status_code == 206
+
+    response = client.get(url, headers={**auth_headers, "Range": f"bytes={len(data)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(data)}"
+
+    downloads = client.get(f"/metrics/{model_id}", headers=auth_headers).json()["usage_stats"]["downloads"]
+    assert downloads["proxied"] == 6
+    assert downloads["proxied_bytes"] == 2 * len(data) + 1000 + (len(data) - 250000) + 10 + 10
+
+
+def test_artifact_download_without_stored_artifact(client, auth_headers, register_model, s3):
+    model = register_model()
+    response = client.get(f"/models/{model['model_id']}/artifact", headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    storage = LocalArtifactStorage(str(tmp_path))
+    app.dependency_overrides[get_artifact_storage] = lambda: storage
+    yield storage
+    del app.dependency_overrides[get_artifact_storage]
+
+
+def test_local_storage_is_content_addressed_and_atomic(client, auth_headers, register_model, local_storage):
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    digest = hashlib.sha256(data).hexdigest()
+    first = register_model(checksum=digest)
+    second = register_model(checksum=digest, version="1.0.1")
+
+    for model in (first, second):
+        response = client.post(f"/models/{model['model_id']}/artifact", content=_chunks(data, 65536), headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["artifact_path"] == f"local://sha256/{digest[:2]}/{digest[2:4]}/{digest}"
+
+    path = os.path.join(local_storage.root, "sha256", digest[:2], digest[2:4], digest)
+    assert file_sha256(path) == digest
+    assert os.listdir(os.path.join(local_storage.root, "tmp")) == []
+
+    response = client.post(f"/models/{first['model_id']}/artifact", content=b"corrupted", headers=auth_headers)
+    assert response.status_code == 422
+    assert os.listdir(os.path.join(local_storage.root, "tmp")) == []
+    assert len(os.listdir(os.path.join(local_storage.root, "sha256"))) == 1
+
+
+def test_local_storage_downloads_ranges(client, auth_headers, register_model, local_storage):
+    data = os.urandom(2 * 1024 * 1024 + 5)
+    model = register_model(checksum=hashlib.sha256(data).hexdigest())
+    client.post(f"/models/{model['model_id']}/artifact", content=data, headers=auth_headers)
+    url = f"/models/{model['model_id']}/artifact"
+
+    # No front proxy configured: served by the API even in redirect mode
+    response = client.get(url, headers=auth_headers)
+    assert response.status_code == 200 and response.content == data
+    assert response.headers["etag"] == f'"{hashlib.sha256(data).hexdigest()}"'
+
+    response = client.get(url, headers={**auth_headers, "Range": "bytes=1048570-1048580"})
+    assert response.status_code == 206
+    assert response.content == data[1048570:1048581]
+
+    downloads = client.get(f"/metrics/{model['model_id']}", headers=auth_headers).json()["usage_stats"]["downloads"]
+    assert downloads["proxied_bytes"] == len(data) + 11
+
+    local_storage.accel_redirect_prefix = "/internal-artifacts/"
+    response = client.get(url, headers=auth_headers)
+    assert response.headers["x-accel-redirect"].startswith("/internal-artifacts/sha256/")
+    assert response.content == b""
+    assert client.get(f"{url}?mode=proxy", headers=auth_headers).content == data
+
+
+def test_local_storage_rejects_foreign_paths(client, auth_headers, register_model, local_storage):
+    model = register_model(artifact_path="local://../../etc/passwd")
+    assert client.get(f"/models/{model['model_id']}/artifact", headers=auth_headers).status_code == 404
+
+
+def test_file_range_response_uses_zerocopysend(tmp_path):
+    path = tmp_path / "artifact"
+    path.write_bytes(b"0123456789")
+    sent = []
+    messages = []
+
+    async def on_sent(size, seconds):
+        sent.append(size)
+
+    async def send(message):
+        messages.append(message)
+
+    response = FileRangeResponse(str(path), 2, 5, 206, {"Content-Length": "4"}, on_sent)
+    scope = {"type": "http", "extensions": {"http.response.zerocopysend": {}}}
+    asyncio.run(response(scope, None, send))
+    assert messages[1]["type"] == "http.response.zerocopysend"
+    assert (messages[1]["offset"], messages[1]["count"]) == (2, 4)
+
+    assert sent == [4]
+
+
+def test_file_range_response_falls_back_to_pread(tmp_path):
+    # What uvicorn gets: no zerocopysend extension in the scope
+    path = tmp_path / "artifact"
+    path.write_bytes(bytes(range(256)) * 4)
+    sent = []
+    messages = []
+
+    async def on_sent(size, seconds):
+        sent.append(size)
+
+    async def send(message):
+        messages.append(message)
+
+    response = FileRangeResponse(str(path), 100, 899, 206, {"Content-Length": "800"}, on_sent)
+    response.chunk_size = 256
+    asyncio.run(response({"type": "http"}, None, send))
+    bodies = messages[1:]
+    assert [len(message["body"]) for message in bodies] == [256, 256, 256, 32]
+    assert [message["more_body"] for message in bodies] == [True, True, True, False]
+    assert b"".join(message["body"] for message in bodies) == path.read_bytes()[100:900]
+    assert sent == [800]
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.main import app
+from app.core.database import async_database_url, get_db
+from app.services.access_accumulator import access_accumulator
+from tests.conftest import SQLALCHEMY_DATABASE_URL, override_get_db
+
+async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL))
+AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def override_get_async_db():
+    async with AsyncTestingSessionLocal() as db:
+        yield db
+
+
+@pytest.fixture
+def async_client(client):
+    app.dependency_overrides[get_db] = override_get_async_db
+    yield client
+    app.dependency_overrides[get_db] = override_get_db
+
+
+def test_async_session_serves_model_routes(async_client, register_model, auth_headers):
+    model = register_model(tags="nlp,async")
+
+    response = async_client.get(f"/models/{model['model_id']}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["model_name"] == "sentiment-classifier"
+
+    listing = async_client.get("/models/", params={"tag": "async"}, headers=auth_headers).json()
+    assert [m["model_id"] for m in listing["models"]] == [model["model_id"]]
+
+    found = async_client.get("/models/search", params={"q": "sentiment"}, headers=auth_headers).json()
+    assert found["total"] == 1
+
+    exported = async_client.get("/models/export", params={"tag": "async"}, headers=auth_headers)
+    assert len(exported.text.splitlines()) == 1 and model["model_id"] in exported.text
+
+    promoted = async_client.post(
+        f"/models/promote/{model['model_id']}",
+        params={"target_status": "production"},
+        headers=auth_headers
+    )
+    assert promoted.status_code == 200
+    latest = async_client.get("/models/latest", headers=auth_headers).json()
+    assert latest["model_id"] == model["model_id"]
+
+    assert async_client.post(f"/metrics/{model['model_id']}/access", headers=auth_headers).status_code == 200
+    access_accumulator.flush()
+    metrics = async_client.get(f"/metrics/{model['model_id']}", headers=auth_headers).json()
+    assert metrics["access_count"] == 1
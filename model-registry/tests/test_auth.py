@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.principals import api_key_cache
+from app.core.security import PasswordHasher, get_password_hash
+from app.services.api_keys import api_key_usage
+
+
+def test_password_hasher_round_trip():
+    hasher = PasswordHasher(workers=1, max_queue=1, retry_after=2)
+    try:
+        hashed = asyncio.run(hasher.hash("s3cret-pass"))
+        assert asyncio.run(hasher.verify("s3cret-pass", hashed))
+        assert not asyncio.run(hasher.verify("wrong-pass", hashed))
+    finally:
+        hasher.shutdown()
+
+
+def test_password_hasher_sheds_load_when_queue_is_full(monkeypatch):
+    hasher = PasswordHasher(workers=1, max_queue=1, retry_after=7)
+    release = threading.Event()
+    monkeypatch.setattr("app.core.security.verify_password", lambda *args: release.wait(5))
+    hashed = get_password_hash("s3cret-pass")
+
+    async def storm():
+        running = asyncio.ensure_future(hasher.verify("a", hashed))
+        queued = asyncio.ensure_future(hasher.verify("b", hashed))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as rejected:
+            await hasher.verify("c", hashed)
+        release.set()
+        await asyncio.gather(running, queued)
+        # Capacity is back once the pool drains
+        assert await hasher.verify("d", hashed)
+        return rejected.value
+
+    try:
+        rejected = asyncio.run(storm())
+    finally:
+        hasher.shutdown()
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "7"
+
+
+def create_api_key(client, auth_headers, **body):
+    response = client.post("/auth/api-keys", json={"name": "ci", **body}, headers=auth_headers)
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_api_key_authenticates_with_its_scopes(client, auth_headers, register_model):
+    register_model()
+    created = create_api_key(client, auth_headers, scopes=["models:read"])
+    assert created["key"].startswith(f"mr_{created['prefix']}_")
+
+    for headers in ({"X-API-Key": created["key"]}, {"Authorization": f"Bearer {created['key']}"}):
+        response = client.get("/models/", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["total"] == 1
+
+    denied = client.post("/models/register", json={}, headers={"X-API-Key": created["key"]})
+    assert denied.status_code == 403
+    assert denied.json()["detail"] == "API key lacks scope models:write"
+    # Keys cannot manage keys
+    assert client.get("/auth/api-keys", headers={"X-API-Key": created["key"]}).status_code == 403
+
+    wrong = created["key"][:-4] + "AAAA"
+    assert client.get("/models/", headers={"X-API-Key": wrong}).status_code == 401
+    assert client.get("/models/").status_code == 403
+
+    listed = client.get("/auth/api-keys", headers=auth_headers).json()
+    assert [key["id"] for key in listed] == [created["id"]]
+    assert "key" not in listed[0]
+
+
+def test_api_key_is_cached_and_revocation_applies_immediately(client, auth_headers):
+    created = create_api_key(client, auth_headers)
+    headers = {"X-API-Key": created["key"]}
+
+    assert client.get("/models/", headers=headers).status_code == 200
+    hits = api_key_cache.stats()["hits"]
+    assert client.get("/models/", headers=headers).status_code == 200
+    assert api_key_cache.stats()["hits"] == hits + 1
+
+    assert client.delete(f"/auth/api-keys/{created['id']}", headers=auth_headers).status_code == 200
+    assert client.get("/models/", headers=headers).status_code == 401
+    assert client.delete(f"/auth/api-keys/{uuid.uuid4()}", headers=auth_headers).status_code == 404
+
+
+def test_api_key_usage_is_recorded_in_batches(client, auth_headers):
+    created = create_api_key(client, auth_headers)
+    for _ in range(3):
+        assert client.get("/models/", headers={"X-API-Key": created["key"]}).status_code == 200
+
+    assert api_key_usage.flush() == 1
+    listed = client.get("/auth/api-keys", headers=auth_headers).json()
+    assert listed[0]["usage_count"] == 3
+    assert listed[0]["last_used_at"] is not None
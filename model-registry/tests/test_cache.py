@@ -0,0 +1,116 @@
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import event
+
+from app.core.cache import TTLCache
+from app.core.principals import PrincipalCache
+from app.models.model import User
+from app.services.model_cache import ModelCache
+from tests.conftest import engine
+
+
+def test_ttl_cache_is_lru_and_counts():
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ModelCache(ttl=60)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "entry"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load(("id", 1, None), load) for _ in range(50)))
+
+    assert asyncio.run(run()) == ["entry"] * 50
+    assert len(calls) == 1
+    assert cache.stats()["size"] == 1
+
+
+def test_invalidation_during_load_is_not_cached():
+    cache = ModelCache(ttl=60)
+
+    async def load():
+        cache.invalidate(1)
+        return "stale"
+
+    assert asyncio.run(cache.get_or_load(("id", 1, None), load)) == "stale"
+    assert cache.stats()["size"] == 0
+
+
+def test_model_lookups_are_cached_until_changed(client, auth_headers, register_model):
+    model = register_model()
+    url = f"/models/{model['model_id']}"
+    client.post(f"/models/promote/{model['model_id']}", params={"target_status": "production"}, headers=auth_headers)
+    assert client.get(url, headers=auth_headers).json()["status"] == "production"
+    assert client.get("/models/latest", headers=auth_headers).json()["model_id"] == model["model_id"]
+
+    queries = []
+    listener = lambda *args: queries.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        client.get(url, headers=auth_headers)
+        client.get("/models/latest", headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert not [sql for sql in queries if "model_registry" in sql]
+
+    client.put(url, json={"display_name": "Renamed"}, headers=auth_headers)
+    assert client.get(url, headers=auth_headers).json()["display_name"] == "Renamed"
+    assert client.get("/models/latest", headers=auth_headers).json()["display_name"] == "Renamed"
+
+    client.delete(url, headers=auth_headers)
+    assert client.get(url, headers=auth_headers).status_code == 404
+
+    stats = client.get("/health/cache").json()["model"]
+    assert stats["hits"] >= 2 and stats["evictions"] >= 2
+
+
+def test_principal_cache_skips_user_query(client, auth_headers):
+    assert client.get("/auth/me", headers=auth_headers).status_code == 200
+
+    queries = []
+    listener = lambda *args: queries.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert client.get("/auth/me", headers=auth_headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert not [sql for sql in queries if "users" in sql]
+
+
+def test_principal_cache_invalidated_on_role_change_and_deactivation(client, auth_headers, db_session):
+    assert client.get("/auth/me", headers=auth_headers).json()["role"] == "consumer"
+    user = db_session.query(User).filter(User.email == "owner@example.com").one()
+
+    user.role = "admin"
+    db_session.commit()
+    assert client.get("/auth/me", headers=auth_headers).json()["role"] == "admin"
+
+    user.is_active = False
+    db_session.commit()
+    assert client.get("/auth/me", headers=auth_headers).status_code == 400
+
+
+def test_principal_cache_never_outlives_token():
+    cache = PrincipalCache(ttl=60)
+    user = User(id=uuid.uuid4(), email="someone@example.com")
+    cache.set("expired", user, expires_at=time.time() - 1)
+    cache.set("valid", user, expires_at=time.time() + 600)
+    assert cache.get("expired") is None
+    assert cache.get("valid") is user
+    assert cache.invalidate(user.id) == 1
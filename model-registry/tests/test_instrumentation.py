@@ -0,0 +1,108 @@
+import logging
+import re
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.core.profiling import SQLProfile, explain
+
+
+def sample(exposition: str, name: str, **labels) -> float:
+    """Value of the sample ``name`` whose labels include ``labels``."""
+    for line in exposition.splitlines():
+        match = re.fullmatch(rf"{name}\{{(.*)\}} (\S+)", line)
+        if match and all(f'{key}="{value}"' in match.group(1) for key, value in labels.items()):
+            return float(match.group(2))
+    return 0.0
+
+
+def test_prometheus_exposition_covers_routes_queries_and_services(client, auth_headers, register_model):
+    model = register_model()
+    before = client.get(settings.PROMETHEUS_PATH).text
+    route = "/models/{model_id}"
+
+    assert client.get(f"/models/{model['model_id']}", headers=auth_headers).status_code == 200
+    assert client.get("/models/00000000-0000-0000-0000-000000000000", headers=auth_headers).status_code == 404
+    assert client.get("/no/such/path").status_code == 404
+
+    response = client.get(settings.PROMETHEUS_PATH)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    after = response.text
+
+    def delta(name, **labels):
+        return sample(after, name, **labels) - sample(before, name, **labels)
+
+    # Labeled by template, never by the raw path
+    assert delta("http_request_duration_seconds_count", method="GET", route=route, status="200") == 1
+    assert delta("http_request_duration_seconds_count", method="GET", route=route, status="404") == 1
+    assert delta("http_request_duration_seconds_count", route="unmatched", status="404") == 1
+    assert model["model_id"] not in after
+
+    assert delta("db_request_queries_count", route=route) == 2
+    assert delta("db_request_queries_sum", route=route) >= 2
+    assert delta("db_query_duration_seconds_count", operation="SELECT") >= 2
+    assert delta("service_method_duration_seconds_count", service="model_service", method="get_model_by_id") >= 1
+    # Only the scrape itself is in flight
+    assert sample(after, "http_requests_in_flight", method="GET") == 1
+
+
+def test_sql_profiling_is_off_by_default(client, auth_headers):
+    assert "server-timing" not in client.get("/models/", headers=auth_headers).headers
+
+
+def test_sql_profiling_adds_server_timing_and_logs_slow_statements(
+    client, auth_headers, register_model, monkeypatch, caplog
+):
+    model = register_model()
+    monkeypatch.setattr(settings, "SQL_PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "SQL_PROFILE_SLOW_STATEMENT_MS", 0.0)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.profiling"):
+        response = client.get(f"/metrics/{model['model_id']}", headers=auth_headers)
+    assert response.status_code == 200
+
+    timing = response.headers["server-timing"]
+    assert re.match(r'db;dur=[\d.]+;desc="1 statements", sql-1;dur=[\d.]+;desc="SELECT model_registry"', timing)
+    report = caplog.records[-1].getMessage()
+    assert report.startswith("GET /metrics/{model_id} 200: 1 statements")
+    assert "SEARCH model_registry USING INDEX" in report
+
+
+def test_sql_profile_flags_repeated_statements():
+    profile = SQLProfile(slow_statement=float("inf"))
+    lookup = "SELECT * FROM model_registry WHERE model_id = ?"
+    for model_id in (1, 1):
+        profile.record(None, lookup, (model_id,), 0.001, False)
+    for tag in ("a", "b", "c"):
+        profile.record(None, "SELECT * FROM model_tags WHERE tag = ?", (tag,), 0.001, False)
+    profile.record(None, "SELECT count(*) FROM model_registry", (), 0.002, False)
+
+    assert profile.repeated(threshold=3) == [
+        (lookup, 2, 1),
+        ("SELECT * FROM model_tags WHERE tag = ?", 3, 3),
+    ]
+    assert profile.repeated(threshold=4) == [(lookup, 2, 1)]
+    assert [statement.summary() for statement in profile.slowest(1)] == ["SELECT model_registry"]
+
+
+class FailingCursor:
+    def __init__(self, executed):
+        self.executed = executed
+
+    def execute(self, statement, parameters=None):
+        self.executed.append(statement.split()[0])
+        if statement.startswith("EXPLAIN"):
+            raise RuntimeError("cannot explain")
+
+    def close(self):
+        pass
+
+
+def test_failed_explain_rolls_back_to_savepoint_on_postgresql():
+    executed = []
+    conn = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"),
+        connection=SimpleNamespace(dbapi_connection=SimpleNamespace(cursor=lambda: FailingCursor(executed)))
+    )
+    assert explain(conn, "SELECT * FROM model_registry WHERE model_id = %(id)s", {"id": 1}) is None
+    assert executed == ["SAVEPOINT", "EXPLAIN", "ROLLBACK"]
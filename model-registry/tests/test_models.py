@@ -1,31 +1,20 @@
-import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.main import app
-from app.core.database import get_db, Base
-from app.models.model import ModelType, ModelStatus
-
-# Test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+import asyncio
+import json
+from datetime import datetime, timedelta
+import uuid
 
-app.dependency_overrides[get_db] = override_get_db
+from sqlalchemy import event, text
+
+from app.core import database
+from app.core.config import settings
+from app.models.model import HEAVY_COLUMNS, ModelRegistryEntry
+from app.schemas.model import SUMMARY_FIELDS, ModelResponse
+from app.services.access_accumulator import access_accumulator
+from app.services.async_model_service import AsyncModelService
+from app.services.model_cache import model_cache
+from app.services.model_service import ModelService
+from tests.conftest import engine as test_engine
 
-@pytest.fixture
-def client():
-    Base.metadata.create_all(bind=engine)
-    with TestClient(app) as c:
-        yield c
-    Base.metadata.drop_all(bind=engine)
 
 def test_health_check(client):
     response = client.get("/health")
@@ -57,4 +46,396 @@ def test_login_user(client):
     assert response.status_code == 200
     data = response.json()
     assert "access_token" in data
-    assert data["token_type"] == "bearer"
\ No newline at end of file
+    assert data["token_type"] == "bearer"
+
+def test_list_models_cursor_pagination(client, auth_headers, register_model):
+    registered = {register_model(version=f"1.0.{i}")["model_id"] for i in range(5)}
+
+    seen = []
+    response = client.get("/models/", params={"size": 2}, headers=auth_headers)
+    for _ in range(5):
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["models"]) <= 2
+        seen.extend(m["model_id"] for m in data["models"])
+        if not data["next_cursor"]:
+            break
+        response = client.get(
+            "/models/",
+            params={"size": 2, "cursor": data["next_cursor"]},
+            headers=auth_headers
+        )
+
+    assert len(seen) == len(registered)
+    assert set(seen) == registered
+
+    by_page = client.get("/models/", params={"size": 5}, headers=auth_headers).json()
+    assert [m["model_id"] for m in by_page["models"]] == seen
+    assert by_page["total"] == 5
+
+
+def test_search_models_invalid_cursor(client, auth_headers, register_model):
+    register_model()
+    response = client.get(
+        "/models/search",
+        params={"q": "sentiment", "cursor": "not-a-cursor"},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
+def test_list_models_count_strategies(client, auth_headers, register_model):
+    for i in range(3):
+        register_model(version=f"2.0.{i}")
+
+    exact = client.get("/models/", headers=auth_headers).json()
+    assert exact["total"] == 3
+    assert exact["count_strategy"] == "exact"
+
+    skipped = client.get("/models/", params={"count": "none"}, headers=auth_headers).json()
+    assert skipped["total"] is None
+    assert skipped["count_strategy"] == "none"
+    assert len(skipped["models"]) == 3
+
+    estimated = client.get(
+        "/models/search",
+        params={"q": "sentiment", "count": "estimated"},
+        headers=auth_headers
+    ).json()
+    assert estimated["total"] == 3
+    assert estimated["count_strategy"] == "estimated"
+
+
+def test_search_models_ranked_with_highlights(client, auth_headers, register_model):
+    register_model(
+        model_name="fraud-detector",
+        display_name="Fraud Detector",
+        tags="finance,sentiment-features",
+        domain="finance"
+    )
+    best = register_model(model_name="sentiment-classifier", display_name="Sentiment Classifier")
+
+    response = client.get("/models/search", params={"q": "sentiment"}, headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert data["models"][0]["model_id"] == best["model_id"]
+    assert data["models"][0]["score"] > data["models"][1]["score"]
+    assert "<mark>" in data["models"][0]["highlights"]["display_name"]
+
+    prefix = client.get("/models/search", params={"q": "fra"}, headers=auth_headers).json()
+    assert [m["model_name"] for m in prefix["models"]] == ["fraud-detector"]
+
+    fuzzy = client.get("/models/search", params={"q": "sentimnet"}, headers=auth_headers).json()
+    assert fuzzy["total"] == 2
+
+    first = client.get(
+        "/models/search", params={"q": "sentiment", "size": 1}, headers=auth_headers
+    ).json()
+    second = client.get(
+        "/models/search",
+        params={"q": "sentiment", "size": 1, "cursor": first["next_cursor"]},
+        headers=auth_headers
+    ).json()
+    assert [m["model_id"] for m in first["models"] + second["models"]] == [
+        m["model_id"] for m in data["models"]
+    ]
+    assert second["next_cursor"] is None
+
+
+def test_search_index_follows_updates_and_deletes(client, auth_headers, register_model):
+    model = register_model()
+    client.put(
+        f"/models/{model['model_id']}",
+        json={"display_name": "Emotion Tagger"},
+        headers=auth_headers
+    )
+    found = client.get("/models/search", params={"q": "emotion"}, headers=auth_headers).json()
+    assert found["total"] == 1
+
+    client.delete(f"/models/{model['model_id']}", headers=auth_headers)
+    gone = client.get("/models/search", params={"q": "emotion"}, headers=auth_headers).json()
+    assert gone["total"] == 0
+
+
+def test_list_models_tag_filters(client, auth_headers, register_model):
+    nlp = register_model(tags="NLP, sentiment")
+    legacy = register_model(version="0.9.0", tags="nlp-legacy,sentiment")
+    vision = register_model(model_name="detector", tags="vision")
+
+    def ids(params):
+        response = client.get("/models/", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        return {m["model_id"] for m in response.json()["models"]}
+
+    assert ids({"tag": "nlp"}) == {nlp["model_id"]}
+    assert ids({"tags": "nlp"}) == {nlp["model_id"]}
+    assert ids({"tag": ["nlp", "sentiment"]}) == {nlp["model_id"]}
+    assert ids({"tag": ["sentiment", "vision"], "tag_match": "any"}) == {
+        nlp["model_id"], legacy["model_id"], vision["model_id"]
+    }
+
+    client.put(f"/models/{legacy['model_id']}", json={"tags": "nlp"}, headers=auth_headers)
+    assert ids({"tag": "nlp"}) == {nlp["model_id"], legacy["model_id"]}
+
+    counts = client.get("/models/tags", headers=auth_headers).json()
+    assert counts[0] == {"tag": "nlp", "count": 2}
+    assert {"tag": "nlp-legacy", "count": 1} not in counts
+
+    # Filters normalize tags like registration does: blank ones are
+    # ignored and long ones truncated to the stored 100 characters
+    assert ids({"tag": " "}) == {nlp["model_id"], legacy["model_id"], vision["model_id"]}
+    long_tag = register_model(model_name="long-tag", tags="t" * 120)
+    assert ids({"tag": ["T" * 120, " "]}) == {long_tag["model_id"]}
+
+
+def test_database_pool_health(client):
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    pools = response.json()["pools"]
+    assert "class" in pools["primary"]
+
+    # Async engines only exist once the async path has asked for them
+    database.async_session_factory()
+    assert set(client.get("/health/db").json()["pools"]) == {"primary", "primary_async"}
+
+
+def test_record_access_is_batched(client, auth_headers, register_model):
+    model = register_model()
+    # Cached with access_count 0; the flush must invalidate it
+    assert client.get(f"/metrics/{model['model_id']}", headers=auth_headers).json()["access_count"] == 0
+    for _ in range(3):
+        response = client.post(f"/metrics/{model['model_id']}/access", headers=auth_headers)
+        assert response.status_code == 200
+    missing = client.post(f"/metrics/{uuid.uuid4()}/access", headers=auth_headers)
+    assert missing.status_code == 404
+
+    assert access_accumulator.flush() == 1
+    metrics = client.get(f"/metrics/{model['model_id']}", headers=auth_headers).json()
+    assert metrics["access_count"] == 3
+    assert metrics["last_accessed"] is not None
+
+
+def batch_item(i, **overrides):
+    item = {
+        "model_name": f"batch-model-{i}",
+        "display_name": f"Batch Model {i}",
+        "version": "1.0.0",
+        "model_type": "GNN",
+        "domain": "graphs",
+        "tags": "batch,graphs",
+        "artifact_path": f"s3://quarlets-models/batch/{i}",
+        "model_format": "pt",
+        "checksum": "0" * 64,
+    }
+    item.update(overrides)
+    return item
+
+
+def test_register_batch_json_atomic(client, auth_headers):
+    items = [batch_item(i) for i in range(5)]
+    response = client.post("/models/register/batch", json=items, headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 5 and data["failed"] == 0
+    assert [r["index"] for r in data["results"]] == list(range(5))
+
+    listing = client.get("/models/", params={"tag": "batch"}, headers=auth_headers).json()
+    assert listing["total"] == 5
+    found = client.get("/models/search", params={"q": "batch"}, headers=auth_headers).json()
+    assert found["total"] == 5
+
+    bad = items + [batch_item(99, model_type="Unknown")]
+    rejected = client.post("/models/register/batch", json=bad, headers=auth_headers)
+    assert rejected.status_code == 422
+    assert rejected.json()["detail"][0]["index"] == 5
+    assert client.get("/models/", headers=auth_headers).json()["total"] == 5
+
+
+def test_register_batch_atomic_database_conflict(client, auth_headers, db_session, monkeypatch):
+    db_session.execute(text("CREATE UNIQUE INDEX uq_batch_name_version ON model_registry (model_name, version)"))
+    db_session.commit()
+
+    # Valid for the schema, rejected by the database
+    items = [batch_item(0), batch_item(1), batch_item(0, artifact_path="s3://quarlets-models/batch/dup")]
+    response = client.post("/models/register/batch", json=items, headers=auth_headers)
+    assert response.status_code == 409
+    detail = response.json()["detail"]
+    assert [result["index"] for result in detail] == [2]
+    assert detail[0]["status"] == "failed" and detail[0]["errors"]
+    assert client.get("/models/", headers=auth_headers).json()["total"] == 0
+
+    # Only the failing chunk is replayed row by row, after the ones before it
+    monkeypatch.setattr(settings, "BULK_INSERT_CHUNK_SIZE", 2)
+    items = [batch_item(i) for i in range(4)] + [batch_item(1, artifact_path="s3://quarlets-models/batch/dup")]
+    response = client.post("/models/register/batch", json=items, headers=auth_headers)
+    assert response.status_code == 409
+    assert [result["index"] for result in response.json()["detail"]] == [4]
+    assert client.get("/models/", headers=auth_headers).json()["total"] == 0
+
+
+def test_register_batch_ndjson_partial(client, auth_headers):
+    lines = [json.dumps(batch_item(0)), json.dumps(batch_item(1, checksum=None)), json.dumps(batch_item(2))]
+    # A malformed line and a non-object are rejected on their own
+    lines += ['{"model_name": "truncated', "[1, 2]"]
+    body = "\n".join(lines) + "\n"
+    response = client.post(
+        "/models/register/batch",
+        params={"mode": "partial"},
+        content=body,
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2 and data["failed"] == 3
+    assert data["results"][1]["status"] == "failed"
+    assert data["results"][2]["model_id"]
+    assert data["results"][3]["errors"][0].startswith("Malformed JSON")
+    assert data["results"][4]["errors"] == ["Each item must be a JSON object"]
+
+    # All or nothing: a malformed line still rejects the body
+    response = client.post(
+        "/models/register/batch",
+        content=body,
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 400
+
+
+def test_export_streams_filtered_rows(client, auth_headers, register_model, db_session):
+    first = register_model(model_name="export-a", tags="nlp,export")
+    register_model(model_name="export-b", domain="vision", model_type="GNN", tags="vision")
+
+    response = client.get("/models/export", params={"tag": "export"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["model_name"] for row in rows] == ["export-a"]
+
+    response = client.get("/models/export", params={"format": "csv"}, headers=auth_headers)
+    lines = response.text.strip().splitlines()
+    assert lines[0].startswith("model_name,display_name")
+    assert len(lines) == 3
+
+    # Entries created in the watermark's second are kept, even exactly on it
+    created_at = db_session.get(ModelRegistryEntry, uuid.UUID(first["model_id"])).created_at
+    for since in (created_at, created_at + timedelta(milliseconds=500)):
+        response = client.get("/models/export", params={"since": since.isoformat()}, headers=auth_headers)
+        assert len(response.text.splitlines()) == 2
+
+    watermark = datetime.utcnow() + timedelta(days=1)
+    response = client.get("/models/export", params={"since": watermark.isoformat()}, headers=auth_headers)
+    assert response.text == ""
+
+    entry = db_session.get(ModelRegistryEntry, uuid.UUID(first["model_id"]))
+    entry.last_updated_at = watermark + timedelta(hours=1)
+    db_session.commit()
+    response = client.get("/models/export", params={"since": watermark.isoformat()}, headers=auth_headers)
+    assert [json.loads(line)["model_name"] for line in response.text.splitlines()] == ["export-a"]
+
+
+def test_sparse_fieldsets(client, auth_headers, register_model, db_session):
+    model = register_model(metrics={"accuracy": 0.9}, input_schema={"text": "string"})
+
+    page = client.get("/models/", params={"view": "summary"}, headers=auth_headers).json()
+    assert set(page["models"][0]) == set(SUMMARY_FIELDS)
+    assert page["total"] == 1
+
+    found = client.get(
+        "/models/search", params={"q": "sentiment", "fields": "model_name"}, headers=auth_headers
+    ).json()
+    assert set(found["models"][0]) == {"model_id", "model_name", "score", "highlights"}
+
+    response = client.get(
+        f"/models/{model['model_id']}", params={"fields": "version,metrics"}, headers=auth_headers
+    )
+    assert response.json() == {"model_id": model["model_id"], "version": "1.0.0", "metrics": {"accuracy": 0.9}}
+
+    full = client.get(f"/models/{model['model_id']}", headers=auth_headers).json()
+    assert full["input_schema"] == {"text": "string"}
+
+    response = client.get("/models/", params={"fields": "model_name,nope"}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_service_defers_heavy_columns(client, register_model, db_session):
+    model_id = uuid.UUID(register_model(metrics={"accuracy": 0.9})["model_id"])
+    service = ModelService(db_session)
+
+    entry = service.get_model_by_id(model_id)
+    assert not set(HEAVY_COLUMNS) & set(entry.__dict__)
+    assert "model_name" in entry.__dict__
+
+    db_session.expunge_all()
+    entry = service.get_model_by_id(model_id, ["version"])
+    assert "version" in entry.__dict__ and "display_name" not in entry.__dict__
+
+
+def test_fast_serialization_matches_model_response(client, auth_headers, register_model, db_session):
+    model = register_model(
+        input_schema={"text": "string"},
+        training_parameters={"epochs": 3, "lr": 0.001},
+        metrics={"accuracy": 0.91, "per_class": [0.9, 0.92]},
+        dataset_name="imdb",
+    )
+    client.post(f"/models/promote/{model['model_id']}", params={"target_status": "production"}, headers=auth_headers)
+    entry = db_session.get(ModelRegistryEntry, uuid.UUID(model["model_id"]))
+    expected = ModelResponse.model_validate(entry).model_dump(mode="json")
+
+    assert client.get(f"/models/{model['model_id']}", headers=auth_headers).json() == expected
+    assert client.get("/models/latest", headers=auth_headers).json() == expected
+    assert client.get("/models/", headers=auth_headers).json()["models"] == [expected]
+
+
+def test_cached_load_runs_on_its_own_session(client, register_model, db_session):
+    model = register_model()
+    model_cache.clear()
+    entry = asyncio.run(AsyncModelService(db_session).get_model_by_id(uuid.UUID(model["model_id"])))
+    assert entry.model_name == model["model_name"]
+    # Others may wait on the load, so the caller closing its session early must not break it
+    assert not db_session.in_transaction() and entry not in db_session
+
+
+def test_conditional_get_model(client, auth_headers, register_model):
+    model = register_model(input_schema={"text": "string"})
+    url = f"/models/{model['model_id']}"
+
+    response = client.get(url, headers=auth_headers)
+    etag = response.headers["etag"]
+    assert etag.startswith('"')
+    assert client.get(url, params={"view": "summary"}, headers=auth_headers).headers["etag"] != etag
+
+    model_cache.clear()
+    queries = []
+    listener = lambda *args: queries.append(args[2])
+    event.listen(test_engine, "before_cursor_execute", listener)
+    try:
+        cached = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    finally:
+        event.remove(test_engine, "before_cursor_execute", listener)
+    assert cached.status_code == 304
+    assert cached.content == b"" and cached.headers["etag"] == etag
+    assert not [sql for sql in queries if "input_schema" in sql]
+
+    client.put(url, json={"display_name": "Renamed"}, headers=auth_headers)
+    changed = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+
+def test_conditional_get_metrics_and_lists(client, auth_headers, register_model):
+    model = register_model()
+    url = f"/metrics/{model['model_id']}"
+    etag = client.get(url, headers=auth_headers).headers["etag"]
+    assert client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+
+    client.post(f"{url}/access", headers=auth_headers)
+    access_accumulator.flush()
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["access_count"] == 1
+
+    page_tag = client.get("/models/", headers=auth_headers).headers["etag"]
+    assert page_tag.startswith('W/"')
+    assert client.get("/models/", headers={**auth_headers, "If-None-Match": page_tag}).status_code == 304
+    register_model(model_name="another-model")
+    assert client.get("/models/", headers={**auth_headers, "If-None-Match": page_tag}).status_code == 200
@@ -0,0 +1,175 @@
+"""Query-plan regression tests for ModelService.
+
+Seeds a synthetic registry, captures the SQL each service method emits and
+runs EXPLAIN on it; a sequential scan of a registry table fails the test.
+Runs on SQLite, and on PostgreSQL as well when ``PLAN_TEST_DATABASE_URL``
+points at a scratch database.
+"""
+import os
+import random
+import re
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.models.model import ModelRegistryEntry, ModelStatus, ModelTag, ModelType
+from app.schemas.model import CountStrategy, TagMatch
+from app.services.model_service import ModelService
+
+PLAN_TEST_ROWS = int(os.environ.get("PLAN_TEST_ROWS", "20000"))
+REGISTRY_TABLES = {"model_registry", "model_tags", "model_search_documents"}
+DOMAINS = [f"domain-{i}" for i in range(25)]
+TAGS = [f"tag-{i}" for i in range(200)]
+
+
+def seed(session: Session, rows: int) -> list:
+    rng = random.Random(13)
+    started = datetime(2024, 1, 1)
+    entries, tags, ids = [], [], []
+    for i in range(rows):
+        model_id = uuid.UUID(int=rng.getrandbits(128))
+        entry_tags = rng.sample(TAGS, 3)
+        entries.append({
+            "model_id": model_id,
+            "model_name": f"model-{i}",
+            "display_name": f"Model {i}",
+            "version": f"1.{i % 10}.0",
+            "parent_model_id": ids[rng.randrange(len(ids))] if ids and rng.random() < 0.3 else None,
+            "model_type": rng.choice(list(ModelType)),
+            "domain": rng.choice(DOMAINS),
+            "tags": ",".join(entry_tags),
+            "artifact_path": f"s3://plans/{i}",
+            "model_format": "onnx",
+            "status": ModelStatus.PRODUCTION if rng.random() < 0.02 else rng.choice(
+                [ModelStatus.DEVELOPMENT, ModelStatus.STAGING, ModelStatus.DEPRECATED]
+            ),
+            "created_by": "plans@example.com",
+            "created_at": started + timedelta(minutes=i),
+            "last_updated_at": started + timedelta(minutes=i, seconds=30) if rng.random() < 0.5 else None,
+            "checksum": "0" * 64,
+            "access_count": 0,
+        })
+        tags.extend({"model_id": model_id, "tag": tag} for tag in entry_tags)
+        ids.append(model_id)
+    session.execute(insert(ModelRegistryEntry), entries)
+    session.execute(insert(ModelTag), tags)
+    ModelService(session).search.rebuild()
+    session.commit()
+    session.execute(text("ANALYZE"))
+    session.commit()
+    return ids
+
+
+def database_urls():
+    yield pytest.param("sqlite", id="sqlite")
+    yield pytest.param(
+        "postgresql", id="postgresql",
+        marks=pytest.mark.skipif(
+            not os.environ.get("PLAN_TEST_DATABASE_URL"), reason="PLAN_TEST_DATABASE_URL not set"
+        )
+    )
+
+
+@pytest.fixture(scope="module", params=list(database_urls()))
+def registry(request, tmp_path_factory):
+    if request.param == "sqlite":
+        url = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    else:
+        url = os.environ["PLAN_TEST_DATABASE_URL"]
+    engine = create_engine(url)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        ids = seed(session, PLAN_TEST_ROWS)
+    yield engine, ids
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@contextmanager
+def captured_statements(engine):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def sequential_scans(engine, statement, parameters) -> list:
+    """Registry tables that ``statement`` reads with a full table scan."""
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+            return [
+                node["Relation Name"] for node in _plan_nodes(plan[0]["Plan"])
+                if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in REGISTRY_TABLES
+            ]
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    # "SCAN t" is a table scan; "SCAN t USING [COVERING] INDEX i" walks an index
+    scans = (re.fullmatch(r"SCAN (\w+)(?: AS \w+)?", row[-1]) for row in rows)
+    return [scan.group(1) for scan in scans if scan and scan.group(1) in REGISTRY_TABLES]
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+SERVICE_QUERIES = {
+    "get_model_by_id": lambda service, ids: service.get_model_by_id(ids[100]),
+    "get_latest_model": lambda service, ids: service.get_latest_model(),
+    "get_latest_model_type": lambda service, ids: service.get_latest_model(ModelType.GNN),
+    "get_latest_model_domain": lambda service, ids: service.get_latest_model(domain="domain-3"),
+    "get_latest_model_type_domain": lambda service, ids: service.get_latest_model(ModelType.SLM, "domain-3"),
+    "list_models": lambda service, ids: service.list_models(count=CountStrategy.NONE),
+    "list_models_cursor": lambda service, ids: _second_page(service),
+    "list_models_type": lambda service, ids: service.list_models(model_type=ModelType.GNN),
+    "list_models_domain": lambda service, ids: service.list_models(domain="domain-7"),
+    "list_models_status": lambda service, ids: service.list_models(status=ModelStatus.STAGING),
+    "list_models_domain_status": lambda service, ids: service.list_models(
+        domain="domain-7", status=ModelStatus.PRODUCTION
+    ),
+    "list_models_tags_all": lambda service, ids: service.list_models(tags=["tag-1", "tag-2"]),
+    "list_models_tags_any": lambda service, ids: service.list_models(
+        tags=["tag-1", "tag-2"], tag_match=TagMatch.ANY
+    ),
+    "export_since": lambda service, ids: service.export_models(
+        since=datetime(2024, 1, 1) + timedelta(minutes=PLAN_TEST_ROWS - 500)
+    ).all(),
+    "search_models": lambda service, ids: service.search_models("model 42"),
+    "increment_access_counts": lambda service, ids: service.increment_access_counts(
+        {model_id: (1, datetime.utcnow()) for model_id in ids[:10]}
+    ),
+}
+
+
+def _second_page(service):
+    _, _, cursor = service.list_models(count=CountStrategy.NONE)
+    return service.list_models(cursor=cursor, count=CountStrategy.NONE)
+
+
+@pytest.mark.parametrize("name", SERVICE_QUERIES)
+def test_service_queries_use_indexes(registry, name):
+    engine, ids = registry
+    with Session(engine) as session, captured_statements(engine) as statements:
+        SERVICE_QUERIES[name](ModelService(session), ids)
+        session.rollback()
+
+    assert statements
+    for statement, parameters in statements:
+        scans = sequential_scans(engine, statement, parameters)
+        assert not scans, f"{name} scans {scans}:\n{statement}"
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.routing import LEAST_CONNECTIONS, ReplicaSet, RoutingSession
+from app.models.model import ModelType
+from app.schemas.model import ModelCreate
+from app.services.model_service import ModelService
+
+
+def make_engine(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def model_create(name):
+    return ModelCreate(
+        model_name=name,
+        display_name=name.title(),
+        version="1.0.0",
+        model_type=ModelType.TRANSFORMER,
+        domain="nlp",
+        artifact_path=f"s3://quarlets-models/{name}",
+        model_format="onnx",
+        checksum="0" * 64,
+    )
+
+
+@pytest.fixture
+def engines(tmp_path):
+    return make_engine(tmp_path / "primary.db"), [
+        make_engine(tmp_path / "replica-0.db"),
+        make_engine(tmp_path / "replica-1.db"),
+    ]
+
+
+def seed(engine, name):
+    with sessionmaker(bind=engine)() as db:
+        entry = ModelService(db).register_model(model_create(name), "seed@example.com")
+        return entry.model_id
+
+
+def test_reads_go_to_replicas_round_robin(engines):
+    primary, replicas = engines
+    on_replica_0 = seed(replicas[0], "replica-zero")
+    on_replica_1 = seed(replicas[1], "replica-one")
+    Session = sessionmaker(bind=primary, class_=RoutingSession, replicas=ReplicaSet(replicas))
+
+    with Session() as db:
+        service = ModelService(db)
+        assert service.get_model_by_id(on_replica_0) is not None
+        models, total, _ = service.list_models()
+        assert [m.model_id for m in models] == [on_replica_0]
+        assert total == 1
+
+    with Session() as db:
+        assert ModelService(db).get_model_by_id(on_replica_1) is not None
+
+
+def test_session_reads_its_own_writes_from_primary(engines):
+    primary, replicas = engines
+    Session = sessionmaker(bind=primary, class_=RoutingSession, replicas=ReplicaSet(replicas))
+
+    with Session() as db:
+        service = ModelService(db)
+        models, total, _ = service.list_models()
+        assert total == 0
+
+        created = service.register_model(model_create("fresh"), "owner@example.com")
+        assert service.get_model_by_id(created.model_id) is not None
+        assert service.list_models()[1] == 1
+
+    with Session() as db:
+        assert ModelService(db).get_model_by_id(created.model_id) is None
+
+
+def test_least_connections_prefers_idle_replica(engines):
+    primary, replicas = engines
+    replica_set = ReplicaSet(replicas, strategy=LEAST_CONNECTIONS)
+    with replicas[0].connect():
+        assert replica_set.choose() is replicas[1]
+    assert replica_set.choose() is replicas[0]
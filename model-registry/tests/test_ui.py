@@ -0,0 +1,75 @@
+import re
+import uuid
+
+
+def login(client):
+    client.post("/ui/register", data={"email": "ui@example.com", "password": "uipass12345"})
+    response = client.post(
+        "/ui/login", data={"username": "ui@example.com", "password": "uipass12345"}, follow_redirects=False
+    )
+    assert response.status_code == 303
+    assert response.headers["location"] == "/ui/dashboard"
+
+
+def test_ui_redirects_to_login_without_a_valid_session(client):
+    for path in ("/ui/models", f"/ui/models/{uuid.uuid4()}", f"/ui/models/{uuid.uuid4()}/metrics"):
+        response = client.get(path, follow_redirects=False)
+        assert response.status_code == 303
+        assert response.headers["location"] == "/ui/login"
+
+    bad_login = client.post("/ui/login", data={"username": "nobody@example.com", "password": "x"})
+    assert bad_login.status_code == 400
+    assert "Invalid credentials" in bad_login.text
+
+
+def test_ui_pages_render_from_the_service(client, register_model):
+    model = register_model(metrics={"accuracy": 0.93})
+    login(client)
+
+    assert "Welcome, ui@example.com!" in client.get("/ui/dashboard").text
+
+    listing = client.get("/ui/models")
+    assert listing.status_code == 200
+    assert "Total: 1" in listing.text
+    assert f"/ui/models/{model['model_id']}" in listing.text
+
+    detail = client.get(f"/ui/models/{model['model_id']}")
+    assert detail.status_code == 200
+    assert "Status:</strong> development" in detail.text
+
+    metrics = client.get(f"/ui/models/{model['model_id']}/metrics")
+    assert metrics.status_code == 200
+    assert '"accuracy": 0.93' in metrics.text
+
+    assert client.get(f"/ui/models/{uuid.uuid4()}").status_code == 404
+    assert client.get(f"/ui/models/{uuid.uuid4()}/metrics").status_code == 404
+
+
+def test_ui_creates_and_deletes_models(client):
+    login(client)
+    form = {
+        "model_name": "ui-model",
+        "display_name": "UI Model",
+        "version": "1.0.0",
+        "model_type": "GNN",
+        "domain": "graphs",
+        "artifact_path": "s3://quarlets-models/ui/1.0.0",
+        "model_format": "onnx",
+        "checksum": "0" * 64,
+    }
+    created = client.post("/ui/models/new", data=form, follow_redirects=False)
+    assert created.status_code == 303
+    listing = client.get("/ui/models").text
+    assert "UI Model" in listing
+
+    model_id = re.search(r"/ui/models/([0-9a-f-]{36})/delete", listing).group(1)
+    deleted = client.post(f"/ui/models/{model_id}/delete", follow_redirects=False)
+    assert deleted.status_code == 303
+    assert client.get(f"/ui/models/{model_id}").status_code == 404
+
+    invalid = client.post("/ui/models/new", data={**form, "model_type": "Unknown"})
+    assert invalid.status_code == 400
+
+    duplicate = client.post("/ui/register", data={"email": "ui@example.com", "password": "uipass12345"})
+    assert duplicate.status_code == 400
+    assert "Email already registered" in duplicate.text